@@ -0,0 +1,156 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_MAX_INFLIGHT = 16
+DEFAULT_DEADLINE_MS = 1000
+MAX_DEADLINE_MS = 30000
+DEADLINE_HEADER = 'X-Request-Deadline-Ms'
+# Set by the proxy (nginx: "t=${msec}") when it accepted the request, so time spent
+# queued in front of the worker counts against the deadline
+REQUEST_START_HEADER = 'X-Request-Start'
+RETRY_AFTER_SECONDS = 1
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot start scoring before its deadline"""
+
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason
+
+
+def queued_seconds(request_start, now=None):
+    """Seconds since the proxy accepted the request, from an X-Request-Start value.
+
+    Accepts "t=<timestamp>" or a bare timestamp in seconds, milliseconds or
+    microseconds since the epoch; missing, unparseable or non-finite values count as 0.
+    """
+    if not request_start:
+        return 0.0
+    try:
+        started = float(request_start.strip().removeprefix('t='))
+    except ValueError:
+        return 0.0
+    if not math.isfinite(started):
+        return 0.0
+    # Tell the unit apart by magnitude
+    if started > 1e14:
+        started /= 1e6
+    elif started > 1e11:
+        started /= 1e3
+    now = time.time() if now is None else now
+    # Clock skew between proxy and worker must never extend the budget
+    return max(now - started, 0.0)
+
+
+class AdmissionController:
+    """Bounded in-flight limit with per-request deadlines.
+
+    A request waits for a free slot only as long as its deadline allows and is
+    rejected with ``Overloaded`` otherwise, so no CPU is spent on callers that
+    have already given up.
+    """
+
+    def __init__(self, max_inflight=DEFAULT_MAX_INFLIGHT, default_deadline_ms=DEFAULT_DEADLINE_MS,
+                 max_deadline_ms=MAX_DEADLINE_MS):
+        self.max_inflight = max_inflight
+        self.default_deadline_ms = default_deadline_ms
+        self.max_deadline_ms = max_deadline_ms
+        self._slots = threading.BoundedSemaphore(max_inflight)
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self._waiting = 0
+        self._counters = {
+            'admitted': 0,
+            'completed': 0,
+            'shed_queue_timeout': 0,
+            'shed_deadline_expired': 0,
+            'shed_model_loading': 0,
+            'fallback': 0,
+        }
+        self._wait_seconds = 0.0
+        self._peak_inflight = 0
+
+    def deadline_from(self, header_value, request_start=None):
+        """Absolute monotonic deadline from a relative budget in ms (header or default).
+
+        The budget runs from ``request_start`` (an X-Request-Start value) when the
+        proxy sent one, otherwise from now.
+        """
+        try:
+            budget_ms = float(header_value) if header_value is not None else self.default_deadline_ms
+        except ValueError:
+            budget_ms = self.default_deadline_ms
+        # NaN would slip through the clamp below and never expire
+        if not math.isfinite(budget_ms):
+            budget_ms = self.default_deadline_ms
+        budget_ms = min(max(budget_ms, 0.0), self.max_deadline_ms)
+        return time.monotonic() - queued_seconds(request_start) + budget_ms / 1000
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def check_deadline(self, deadline):
+        """Raise if the deadline passed, e.g. before starting inference"""
+        if time.monotonic() >= deadline:
+            self._count('shed_deadline_expired')
+            raise Overloaded('deadline_expired')
+
+    @contextmanager
+    def admit(self, deadline):
+        started = time.monotonic()
+        remaining = deadline - started
+        if remaining <= 0:
+            self._count('shed_deadline_expired')
+            raise Overloaded('deadline_expired')
+        with self._lock:
+            self._waiting += 1
+        acquired = self._slots.acquire(timeout=remaining)
+        with self._lock:
+            self._waiting -= 1
+            if acquired:
+                self._inflight += 1
+                self._peak_inflight = max(self._peak_inflight, self._inflight)
+                self._counters['admitted'] += 1
+                self._wait_seconds += time.monotonic() - started
+            else:
+                self._counters['shed_queue_timeout'] += 1
+        if not acquired:
+            raise Overloaded('queue_timeout')
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._inflight -= 1
+                self._counters['completed'] += 1
+            self._slots.release()
+
+    @property
+    def busy(self):
+        """True while any request is being scored or waiting for a slot"""
+        return self._inflight > 0 or self._waiting > 0
+
+    def reject(self, reason):
+        """Count a request shed outside admit(), e.g. while the model is loading"""
+        self._count(f'shed_{reason}')
+        return Overloaded(reason)
+
+    def record_fallback(self):
+        self._count('fallback')
+
+    def snapshot(self):
+        with self._lock:
+            admitted = self._counters['admitted']
+            return {
+                'max_inflight': self.max_inflight,
+                'default_deadline_ms': self.default_deadline_ms,
+                'inflight': self._inflight,
+                'waiting': self._waiting,
+                'peak_inflight': self._peak_inflight,
+                **self._counters,
+                'shed': sum(count for name, count in self._counters.items() if name.startswith('shed_')),
+                'mean_queue_wait_ms': self._wait_seconds / admitted * 1000 if admitted else 0.0,
+            }
@@ -1,10 +1,11 @@
 import streamlit as st
-import numpy as np
 import pickle
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime
-import pandas as pd
+
+# plotly, pandas and the model itself are loaded on first use to keep cold starts fast
+from explain import IMPORTANCE_FILE, Explainer, load_global_importance
+from features import FEATURE_COLUMNS, TYPE_MAP, to_matrix
+from rules import RuleEngine, tier_of
 
 # --- Page configuration ---
 st.set_page_config(
@@ -15,7 +16,7 @@ st.set_page_config(
 )
 
 # --- Load Model ---
-@st.cache_resource
+@st.cache_resource(show_spinner="Loading model...")
 def load_artifacts():
     import os
     # Handle path correctly whether running from src or root directory
@@ -24,10 +25,21 @@ def load_artifacts():
         model = pickle.load(f)
     return model
 
-model = load_artifacts()
+@st.cache_resource
+def load_explainer():
+    import os
+    model = load_artifacts()
+    # Global importances are precomputed at training time and stored next to the model
+    models_dir = '../models' if os.path.exists('../models/model.pkl') else 'models'
+    importance = load_global_importance(os.path.join(models_dir, IMPORTANCE_FILE))
+    if importance is None:
+        importance = dict(zip(FEATURE_COLUMNS, map(float, model.feature_importances_)))
+    return Explainer(model), importance
+
+rule_engine = RuleEngine()
 
 # --- Type encoding ---
-type_map = {'PAYMENT': 0, 'TRANSFER': 1, 'CASH_OUT': 2, 'DEBIT': 3, 'CASH_IN': 4}
+type_map = TYPE_MAP
 type_options = list(type_map.keys())
 
 # --- Enhanced Custom CSS ---
@@ -86,6 +98,8 @@ st.markdown("""
 
 # --- Sidebar ---
 with st.sidebar:
+    mode = st.radio("Mode", ["Single Transaction", "Batch Upload"])
+    st.markdown("---")
     st.markdown("### Quick Actions")
     if st.button("Fill Sample Payment"):
         st.session_state.quick_fill = {
@@ -122,6 +136,82 @@ with st.sidebar:
     </div>
     """, unsafe_allow_html=True)
 
+# --- Batch Upload ---
+def render_batch_summary(summary, container):
+    """Draw the running aggregate risk distribution"""
+    with container.container():
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("Transactions Scored", f"{summary.rows:,}")
+        m2.metric("High Risk", f"{summary.tier_counts[2]:,}")
+        m3.metric("Medium Risk", f"{summary.tier_counts[1]:,}")
+        m4.metric("Mean Fraud Probability", f"{summary.mean_probability * 100:.2f}%")
+        c1, c2 = st.columns(2)
+        c1.bar_chart(summary.tier_frame(), x='risk_level', y='transactions')
+        c2.bar_chart(summary.histogram_frame(), x='fraud_probability', y='transactions')
+
+def render_batch_page():
+    """Score an uploaded CSV in chunks and offer the results as a download"""
+    import os
+    import tempfile
+    import pandas as pd
+    from batch import BATCH_CHUNK_SIZE, BatchSummary, score_chunks
+    
+    st.markdown("### 📂 Batch Scoring")
+    st.markdown("Upload a CSV with columns `step, type, amount, oldbalanceOrg, newbalanceOrg, "
+                "oldbalanceDest, newbalanceDest` (extra columns such as `nameOrig`/`nameDest` are kept).")
+    
+    # The form keeps file selection from triggering a rescore on every rerun
+    with st.form("batch_form"):
+        uploaded = st.file_uploader("Transactions CSV", type=['csv'])
+        chunk_size = st.number_input("Rows per chunk", min_value=1000, value=BATCH_CHUNK_SIZE, step=10000)
+        submitted = st.form_submit_button("🔍 Score File")
+    
+    if submitted and uploaded is not None:
+        # Only the latest result is offered for download; drop the previous file
+        previous = st.session_state.pop('batch_result', None)
+        if previous and os.path.exists(previous['path']):
+            os.unlink(previous['path'])
+        progress = st.progress(0.0, text="Scoring...")
+        live = st.empty()
+        summary = BatchSummary()
+        output = tempfile.NamedTemporaryFile(prefix='scored_', suffix='.csv.gz', delete=False)
+        output.close()
+        try:
+            chunks = pd.read_csv(uploaded, chunksize=int(chunk_size))
+            model = load_artifacts()
+            for i, (scored, summary) in enumerate(score_chunks(model, chunks, rule_engine, summary)):
+                scored.to_csv(output.name, mode='w' if i == 0 else 'a', header=(i == 0),
+                              index=False, compression='gzip')
+                fraction = min(uploaded.tell() / max(uploaded.size, 1), 1.0)
+                progress.progress(fraction, text=f"Scored {summary.rows:,} transactions")
+                render_batch_summary(summary, live)
+        except ValueError as e:
+            os.unlink(output.name)
+            st.error(f"❌ Could not score file: {e}")
+            return
+        except BaseException:
+            # Failed or interrupted by a rerun: never leave a partial file behind
+            os.unlink(output.name)
+            raise
+        progress.progress(1.0, text=f"Done - scored {summary.rows:,} transactions")
+        st.session_state.batch_result = {'path': output.name, 'name': uploaded.name, 'summary': summary}
+    elif 'batch_result' in st.session_state:
+        render_batch_summary(st.session_state.batch_result['summary'], st.empty())
+    
+    result = st.session_state.get('batch_result')
+    if result:
+        with open(result['path'], 'rb') as f:
+            st.download_button(
+                "⬇️ Download Scored Transactions",
+                data=f,
+                file_name=f"scored_{result['name']}.gz",
+                mime='application/gzip'
+            )
+
+if mode == "Batch Upload":
+    render_batch_page()
+    st.stop()
+
 # --- Main Form ---
 st.markdown('<div class="form-card">', unsafe_allow_html=True)
 quick_fill = st.session_state.get('quick_fill', {})
@@ -229,7 +319,7 @@ st.markdown("""
 
 
 def preprocess_input():
-    arr = np.array([
+    return to_matrix([
         step,
         type_map[type_val],
         amount,
@@ -237,11 +327,11 @@ def preprocess_input():
         newbalanceOrg,
         oldbalanceDest,
         newbalanceDest
-    ]).reshape(1, -1)
-    return arr
+    ])
 
 def create_risk_gauge(fraud_probability):
     """Create a risk gauge visualization"""
+    import plotly.graph_objects as go
     fig = go.Figure(go.Indicator(
         mode = "gauge+number+delta",
         value = fraud_probability * 100,
@@ -268,11 +358,25 @@ def create_risk_gauge(fraud_probability):
     )
     return fig
 
+# --- Display names for model features ---
+feature_labels = {
+    'step': 'Step',
+    'type': 'Transaction Type',
+    'amount': 'Amount',
+    'oldbalanceOrg': 'Old Balance (Sender)',
+    'newbalanceOrg': 'New Balance (Sender)',
+    'oldbalanceDest': 'Old Balance (Recipient)',
+    'newbalanceDest': 'New Balance (Recipient)'
+}
+
+@st.cache_resource
 def create_feature_importance_chart():
-    """Create a feature importance visualization"""
-    features = ['Amount', 'Old Balance (Sender)', 'New Balance (Sender)', 
-               'Old Balance (Recipient)', 'New Balance (Recipient)', 'Transaction Type', 'Step']
-    importance = [0.45, 0.25, 0.15, 0.08, 0.04, 0.02, 0.01]  # Mock importance values
+    """Create a feature importance visualization (built once per process)"""
+    import plotly.express as px
+    _, global_importance = load_explainer()
+    ranked = sorted(global_importance.items(), key=lambda item: item[1])
+    features = [feature_labels.get(name, name) for name, _ in ranked]
+    importance = [value for _, value in ranked]
     
     fig = px.bar(
         x=importance,
@@ -290,6 +394,28 @@ def create_feature_importance_chart():
     )
     return fig
 
+def create_contribution_chart(explanation):
+    """Create a per-transaction attribution visualization"""
+    import plotly.graph_objects as go
+    contributions = explanation['contributions'][::-1]
+    features = [feature_labels.get(c['feature'], c['feature']) for c in contributions]
+    values = [c['value'] for c in contributions]
+    
+    fig = go.Figure(go.Bar(
+        x=values,
+        y=features,
+        orientation='h',
+        marker_color=['#e74c3c' if v > 0 else '#27ae60' for v in values]
+    ))
+    fig.update_layout(
+        title="Why this score? (log-odds contribution)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        font={'color': "darkblue"},
+        height=400
+    )
+    return fig
+
 # --- Main Action Button ---
 st.markdown("<br>", unsafe_allow_html=True)
 analyze_col1, analyze_col2, analyze_col3 = st.columns([1, 2, 1])
@@ -297,13 +423,26 @@ analyze_col1, analyze_col2, analyze_col3 = st.columns([1, 2, 1])
 with analyze_col2:
     if st.button("🔍 Analyze Transaction", key="analyze"):
         X = preprocess_input()
+        model = load_artifacts()
+        explainer, _ = load_explainer()
         pred = model.predict_proba(X)
         fraud_probability = pred[0][1]
+        risk_level = tier_of(fraud_probability)
+        assessment = rule_engine.assess_one({
+            'type': type_val,
+            'amount': amount,
+            'oldbalanceOrg': oldbalanceOrg,
+            'newbalanceOrg': newbalanceOrg,
+            'oldbalanceDest': oldbalanceDest,
+            'newbalanceDest': newbalanceDest,
+            'sender': sender,
+            'recipient': recipient
+        })
         
         st.markdown("---")
         
         # Risk Assessment Display
-        if fraud_probability > 0.7:
+        if risk_level == 'HIGH':
             st.markdown("""
                 <div class="fraud-alert">
                     <h2>🚨 HIGH RISK TRANSACTION DETECTED!</h2>
@@ -313,7 +452,7 @@ with analyze_col2:
                 </div>
                 """.format(fraud_probability * 100), unsafe_allow_html=True)
             st.snow()
-        elif fraud_probability > 0.3:
+        elif risk_level == 'MEDIUM':
             st.markdown("""
                 <div style="background: linear-gradient(45deg, #f39c12, #e67e22); color: white; padding: 1.5rem; border-radius: 15px; text-align: center; font-weight: 600; margin: 1rem 0;">
                     <h2>⚠️ MEDIUM RISK TRANSACTION</h2>
@@ -345,20 +484,11 @@ with analyze_col2:
             
             # Risk Factors
             st.markdown("#### Risk Factors Analysis")
-            risk_factors = []
-            
-            if amount > 10000:
-                risk_factors.append("• High transaction amount")
-            if oldbalanceOrg == newbalanceOrg + amount:
-                risk_factors.append("• Perfect balance consistency")
-            if newbalanceDest == 0 and oldbalanceDest == 0:
-                risk_factors.append("• Recipient account shows no activity")
-            if type_val in ['CASH_OUT', 'TRANSFER']:
-                risk_factors.append(f"• {type_val} transactions have higher risk")
+            risk_factors = assessment['risk_factors']
             
             if risk_factors:
                 for factor in risk_factors:
-                    st.markdown(factor)
+                    st.markdown(f"• {factor}")
             else:
                 st.markdown("• No significant risk factors detected")
         
@@ -367,15 +497,20 @@ with analyze_col2:
             importance_fig = create_feature_importance_chart()
             st.plotly_chart(importance_fig, use_container_width=True)
             
+            # Per-transaction attributions
+            contribution_fig = create_contribution_chart(explainer.explain(X[0]))
+            st.plotly_chart(contribution_fig, use_container_width=True)
+            
             # Transaction Validation
             st.markdown("#### Transaction Validation")
-            balance_check = oldbalanceOrg - newbalanceOrg == amount
+            validation = assessment['validation']
+            balance_check = validation['balance_consistent']
             st.markdown(f"**Balance Consistency:** {'✅ Valid' if balance_check else '❌ Invalid'}")
             
-            amount_reasonable = amount > 0 and amount < 100000
+            amount_reasonable = validation['amount_reasonable']
             st.markdown(f"**Amount Range:** {'✅ Reasonable' if amount_reasonable else '❌ Suspicious'}")
             
-            participant_check = sender != recipient
+            participant_check = validation['different_participants']
             st.markdown(f"**Participants:** {'✅ Different' if participant_check else '❌ Same person'}")
         
         # Additional Recommendations
@@ -388,7 +523,7 @@ with analyze_col2:
             - 🔍 **Conduct manual review**
             - 📝 **Document the incident**
             """)
-        elif fraud_probability > 0.3:
+        elif risk_level == 'MEDIUM':
             st.markdown("""
             - 🔐 **Request additional authentication**
             - 📱 **Send OTP verification**
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+from features import FEATURE_COLUMNS, coerce_frame, encode_types, rename_raw_columns, to_matrix
+from rules import TIER_NAMES, RuleEngine, tier_index
+
+BATCH_CHUNK_SIZE = 50000
+PROBABILITY_BINS = 20
+# Columns an upload may omit, with the defaults the API uses
+OPTIONAL_DEFAULTS = {'step': 1}
+
+
+class BatchSummary:
+    """Running aggregates over scored chunks; size is independent of row count"""
+
+    def __init__(self, bins=PROBABILITY_BINS):
+        self.rows = 0
+        self.probability_sum = 0.0
+        self.tier_counts = np.zeros(len(TIER_NAMES), dtype=np.int64)
+        self.bin_edges = np.linspace(0.0, 1.0, bins + 1)
+        self.histogram = np.zeros(bins, dtype=np.int64)
+        self.rule_hits = {}
+
+    def update(self, probabilities, tiers, rule_results):
+        self.rows += len(probabilities)
+        self.probability_sum += float(probabilities.sum())
+        self.tier_counts += np.bincount(tiers, minlength=len(TIER_NAMES))
+        self.histogram += np.histogram(probabilities, bins=self.bin_edges)[0]
+        for name, fired in rule_results.items():
+            self.rule_hits[name] = self.rule_hits.get(name, 0) + int(fired.sum())
+        return self
+
+    @property
+    def mean_probability(self):
+        return self.probability_sum / self.rows if self.rows else 0.0
+
+    def tier_frame(self):
+        return pd.DataFrame({'risk_level': TIER_NAMES, 'transactions': self.tier_counts})
+
+    def histogram_frame(self):
+        return pd.DataFrame({
+            'fraud_probability': [f"{lo:.2f}-{hi:.2f}" for lo, hi in zip(self.bin_edges[:-1], self.bin_edges[1:])],
+            'transactions': self.histogram
+        })
+
+
+def prepare_chunk(chunk):
+    """Validate an uploaded chunk and build the model input matrix"""
+    rename_raw_columns(chunk)
+    for column, default in OPTIONAL_DEFAULTS.items():
+        if column not in chunk:
+            chunk[column] = default
+    missing = [c for c in FEATURE_COLUMNS if c not in chunk]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+    frame = pd.DataFrame({
+        # encode_types returns a fresh index; later read_csv chunks do not start at 0
+        column: encode_types(chunk['type'].to_numpy()).to_numpy() if column == 'type'
+        else pd.to_numeric(chunk[column], errors='raise')
+        for column in FEATURE_COLUMNS
+    }, index=chunk.index)
+    # Same boundary rules as /api/analyze: no empty cells, whole steps, schema ranges
+    empty = {c: int(n) for c, n in frame.isna().sum().items() if n}
+    if empty:
+        raise ValueError(f"Empty values in columns: {empty}")
+    if (frame['step'] % 1 != 0).any():
+        raise ValueError("Column 'step' must hold whole numbers")
+    return to_matrix(coerce_frame(frame))
+
+
+def score_chunk(model, chunk, rule_engine, summary):
+    """Score one chunk vectorized and fold it into the running summary"""
+    X = prepare_chunk(chunk)
+    probabilities = model.predict_proba(X)[:, 1]
+    tiers = tier_index(probabilities)
+    assessment = rule_engine.assess(chunk)
+    summary.update(probabilities, tiers, assessment['results'])
+
+    scored = chunk.copy()
+    scored['fraud_probability'] = probabilities
+    scored['risk_level'] = np.asarray(TIER_NAMES)[tiers]
+    scored['risk_factors'] = ['; '.join(factors) for factors in assessment['risk_factors']]
+    return scored
+
+
+def score_chunks(model, chunks, rule_engine=None, summary=None):
+    """Score an iterable of DataFrame chunks, yielding (scored_chunk, summary) as it goes"""
+    rule_engine = rule_engine or RuleEngine()
+    summary = summary or BatchSummary()
+    for chunk in chunks:
+        yield score_chunk(model, chunk, rule_engine, summary), summary
@@ -0,0 +1,172 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+from xgboost.callback import TrainingCallback
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_DIR = 'checkpoints'
+CHECKPOINT_EVERY = 10
+STATE_FILE = 'state.json'
+BOOSTER_FILE = 'booster.ubj'
+SPLIT_FILE = 'split.npz'
+PUBLISHED_DIR = 'published'
+# Completed runs kept (newest first); older run directories are deleted
+KEEP_RUNS = 3
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def file_digest(path):
+    """Content hash of a data file, read in blocks"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fingerprint_inputs(paths, config):
+    """Short id of a training run: the content of its data files plus its configuration"""
+    inputs = {
+        'data': [file_digest(path) for path in paths],
+        'config': config,
+    }
+    return hashlib.sha1(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+class BoosterCheckpoint(TrainingCallback):
+    """XGBoost callback saving the booster to the run directory every `every` rounds"""
+
+    def __init__(self, run, every=CHECKPOINT_EVERY):
+        super().__init__()
+        self.run = run
+        self.every = every
+
+    def after_iteration(self, model, epoch, evals_log):
+        # Counts rounds restored from an earlier checkpoint too
+        rounds = model.num_boosted_rounds()
+        if rounds % self.every == 0:
+            self.run.save_booster(model, rounds)
+        return False
+
+
+class TrainingRun:
+    """Checkpoint state for one set of training inputs, kept in ``<models>/checkpoints/<fingerprint>/``.
+
+    ``status`` moves from 'training' (booster saved every few rounds) to 'boosted'
+    (all rounds done) to 'complete' (artifacts written). Every file is replaced
+    atomically, so a crash at any point leaves the last good checkpoint behind.
+    A complete run keeps copies of the artifacts it published, so a later run with
+    the same inputs can put them back in place instead of retraining.
+    """
+
+    def __init__(self, models_dir, fingerprint):
+        self.fingerprint = fingerprint
+        self.directory = Path(models_dir) / CHECKPOINT_DIR / fingerprint
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.state = self._load_state()
+
+    @property
+    def booster_path(self):
+        return self.directory / BOOSTER_FILE
+
+    def _load_state(self):
+        state_path = self.directory / STATE_FILE
+        if state_path.exists():
+            with open(state_path) as f:
+                return json.load(f)
+        return {'fingerprint': self.fingerprint, 'status': 'new', 'rounds': 0}
+
+    def _update_state(self, **changes):
+        self.state.update(changes, updated=datetime.now().isoformat(timespec='seconds'))
+        tmp_path = self.directory / f'{STATE_FILE}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.directory / STATE_FILE)
+
+    @property
+    def rounds(self):
+        """Boosting rounds available to resume from"""
+        return self.state['rounds'] if self.booster_path.exists() else 0
+
+    @property
+    def completed_artifact(self):
+        """Model artifact of a finished run with these inputs, if it and its published copies are on disk"""
+        artifact = self.state.get('artifact')
+        if self.state['status'] != 'complete' or not artifact or not Path(artifact).exists():
+            return None
+        published = self.directory / PUBLISHED_DIR
+        if not all((published / Path(path).name).exists() for path in self.state.get('published', [])):
+            return None
+        return Path(artifact)
+
+    def save_split(self, **indices):
+        tmp_path = self.directory / 'split.tmp.npz'
+        np.savez(tmp_path, **indices)
+        os.replace(tmp_path, self.directory / SPLIT_FILE)
+
+    def load_split(self):
+        split_path = self.directory / SPLIT_FILE
+        if not split_path.exists():
+            return None
+        with np.load(split_path) as split:
+            return {name: split[name] for name in split.files}
+
+    def save_booster(self, model, rounds, status='training'):
+        """Atomically replace the booster checkpoint (a Booster or a fitted XGBClassifier)"""
+        tmp_path = self.directory / 'booster.tmp.ubj'
+        model.save_model(str(tmp_path))
+        os.replace(tmp_path, self.booster_path)
+        self._update_state(status=status, rounds=int(rounds))
+        logger.info(f"Checkpoint {self.fingerprint}: {rounds} rounds ({status})")
+
+    def reset(self):
+        """Drop every checkpoint so the run starts from scratch"""
+        for name in (BOOSTER_FILE, SPLIT_FILE, STATE_FILE):
+            (self.directory / name).unlink(missing_ok=True)
+        self.state = self._load_state()
+
+    def mark_complete(self, artifact, published=()):
+        """Record the finished run with copies of the shared artifacts it wrote, and drop its checkpoints"""
+        published_dir = self.directory / PUBLISHED_DIR
+        published_dir.mkdir(exist_ok=True)
+        for path in published:
+            shutil.copy2(path, published_dir / Path(path).name)
+        self._update_state(status='complete', artifact=str(artifact), published=[str(p) for p in published])
+        # The booster and split are only needed to resume an unfinished run
+        for name in (BOOSTER_FILE, SPLIT_FILE):
+            (self.directory / name).unlink(missing_ok=True)
+
+    def restore(self):
+        """Put this run's published artifacts back in place (atomically per file)"""
+        restored = []
+        for path in self.state.get('published', []):
+            tmp_path = f'{path}.tmp'
+            shutil.copy2(self.directory / PUBLISHED_DIR / Path(path).name, tmp_path)
+            os.replace(tmp_path, path)
+            restored.append(path)
+        # Counts as recently used, so pruning keeps the run that is being served
+        self._update_state(restored=datetime.now().isoformat(timespec='seconds'))
+        return restored
+
+
+def prune_runs(models_dir, keep=KEEP_RUNS, current=None):
+    """Delete all but the `keep` most recently updated run directories (never `current`)"""
+    root = Path(models_dir) / CHECKPOINT_DIR
+    if not root.exists():
+        return []
+    runs = sorted(
+        (d for d in root.iterdir() if d.is_dir()),
+        key=lambda d: (d / STATE_FILE).stat().st_mtime if (d / STATE_FILE).exists() else d.stat().st_mtime,
+        reverse=True
+    )
+    removed = [d for d in runs[keep:] if d.name != current]
+    for directory in removed:
+        shutil.rmtree(directory, ignore_errors=True)
+        logger.info(f"Pruned checkpoint directory {directory}")
+    return removed
@@ -0,0 +1,316 @@
+import bisect
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+import numpy as np
+
+from features import FEATURE_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+DRIFT_FILE = 'drift_reference.json'
+DRIFT_BINS = 20
+DRIFT_SAMPLE_ROWS = 500000
+PROBABILITY_COLUMN = 'fraud_probability'
+MONITORED_COLUMNS = FEATURE_COLUMNS + [PROBABILITY_COLUMN]
+# Conventional PSI bands: < 0.1 stable, 0.1-0.25 moderate shift, > 0.25 drift
+PSI_WARNING = 0.1
+PSI_DRIFT = 0.25
+# Below this many observations PSI is dominated by empty buckets
+MIN_OBSERVATIONS = 200
+# Worker sketches are flushed to disk by a background thread this often
+FLUSH_SECONDS = 30
+# Live counts are kept per worker per epoch; reports cover the latest WINDOW_EPOCHS
+# and older files are deleted, so dead workers and past deploys age out
+EPOCH_SECONDS = 3600
+WINDOW_EPOCHS = 24
+
+
+class HistogramSketch:
+    """Fixed-edge histogram; updates are O(log bins) and sketches merge by adding counts.
+
+    Bucket i holds values v with edges[i-1] <= v < edges[i]; the first and last
+    buckets are open-ended so nothing seen in production is ever lost.
+    """
+
+    def __init__(self, edges, counts=None):
+        self.edges = [float(e) for e in edges]
+        self.counts = np.zeros(len(self.edges) + 1, dtype=np.int64) if counts is None \
+            else np.asarray(counts, dtype=np.int64).copy()
+
+    @classmethod
+    def from_sample(cls, values, bins=DRIFT_BINS):
+        """Quantile edges from a sample; low-cardinality columns get one bucket per value"""
+        values = np.asarray(values, dtype=np.float64)
+        distinct = np.unique(values)
+        if len(distinct) <= bins:
+            edges = (distinct[:-1] + distinct[1:]) / 2
+        else:
+            edges = np.unique(np.quantile(values, np.linspace(0, 1, bins + 1)[1:-1]))
+        sketch = cls(edges)
+        sketch.update_many(values)
+        return sketch
+
+    def update(self, value):
+        self.counts[bisect.bisect_right(self.edges, value)] += 1
+
+    def update_many(self, values):
+        buckets = np.searchsorted(self.edges, np.asarray(values, dtype=np.float64), side='right')
+        self.counts += np.bincount(buckets, minlength=len(self.counts))
+
+    def merge(self, other):
+        if other.edges != self.edges:
+            raise ValueError("Cannot merge sketches with different bucket edges")
+        self.counts += other.counts
+        return self
+
+    def empty_like(self):
+        return HistogramSketch(self.edges)
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+
+def psi(expected, actual, eps=1e-6):
+    """Population stability index between two count vectors over the same buckets"""
+    p = np.asarray(expected, dtype=np.float64)
+    q = np.asarray(actual, dtype=np.float64)
+    p = np.clip(p / max(p.sum(), 1), eps, None)
+    q = np.clip(q / max(q.sum(), 1), eps, None)
+    return float(np.sum((q - p) * np.log(q / p)))
+
+
+def ks_statistic(expected, actual):
+    """Max CDF distance between two count vectors over the same buckets"""
+    p = np.cumsum(expected) / max(np.sum(expected), 1)
+    q = np.cumsum(actual) / max(np.sum(actual), 1)
+    return float(np.max(np.abs(p - q)))
+
+
+class DriftSketch:
+    """One HistogramSketch per monitored column (the 7 features plus the output probability)"""
+
+    def __init__(self, sketches):
+        self.sketches = dict(sketches)
+        self._columns = list(self.sketches)
+        self._feature_sketches = [self.sketches[c] for c in FEATURE_COLUMNS]
+        self._probability_sketch = self.sketches[PROBABILITY_COLUMN]
+
+    @classmethod
+    def fit(cls, X, probabilities, bins=DRIFT_BINS):
+        """Build the training-time reference from a feature matrix and model outputs"""
+        X = np.asarray(X, dtype=np.float64)
+        sketches = {col: HistogramSketch.from_sample(X[:, j], bins) for j, col in enumerate(FEATURE_COLUMNS)}
+        sketches[PROBABILITY_COLUMN] = HistogramSketch.from_sample(probabilities, bins)
+        return cls(sketches)
+
+    def empty_like(self):
+        return DriftSketch({col: s.empty_like() for col, s in self.sketches.items()})
+
+    def update(self, row, probability):
+        """Record one scored transaction"""
+        for sketch, value in zip(self._feature_sketches, row):
+            sketch.update(value)
+        self._probability_sketch.update(probability)
+
+    def merge(self, other):
+        for col, sketch in self.sketches.items():
+            sketch.merge(other.sketches[col])
+        return self
+
+    @property
+    def total(self):
+        return self._probability_sketch.total
+
+    @property
+    def fingerprint(self):
+        """Short id of the bucket layout; sketches with the same id are mergeable"""
+        layout = json.dumps({col: s.edges for col, s in self.sketches.items()}, sort_keys=True)
+        return hashlib.sha1(layout.encode()).hexdigest()[:12]
+
+    def to_dict(self):
+        return {col: {'edges': s.edges, 'counts': s.counts.tolist()} for col, s in self.sketches.items()}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls({col: HistogramSketch(d['edges'], d['counts']) for col, d in data.items()})
+
+    def save(self, path):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def build_reference(model, X, max_rows=DRIFT_SAMPLE_ROWS, random_state=42):
+    """Reference sketch over (a sample of) the training matrix and its predicted probabilities"""
+    if len(X) > max_rows:
+        rows = np.sort(np.random.default_rng(random_state).choice(len(X), size=max_rows, replace=False))
+        X = X.iloc[rows] if hasattr(X, 'iloc') else X[rows]
+    reference = DriftSketch.fit(X, model.predict_proba(X)[:, 1])
+    logger.info(f"Drift reference built over {len(X)} rows")
+    return reference
+
+
+def drift_report(reference, current, min_observations=MIN_OBSERVATIONS):
+    """PSI / KS per monitored column of current traffic against the reference"""
+    columns = {}
+    for col, ref in reference.sketches.items():
+        cur = current.sketches[col]
+        score = psi(ref.counts, cur.counts) if cur.total else None
+        columns[col] = {
+            'psi': score,
+            'ks': ks_statistic(ref.counts, cur.counts) if cur.total else None,
+            'status': (
+                'no data' if score is None else
+                'insufficient data' if cur.total < min_observations else
+                'drift' if score > PSI_DRIFT else
+                'warning' if score > PSI_WARNING else
+                'stable'
+            ),
+        }
+    return {'observations': current.total, 'columns': columns}
+
+
+class DriftMonitor:
+    """Per-process live sketch, periodically flushed so all workers can be merged.
+
+    Each worker writes the counts of the current epoch to
+    ``<directory>/<reference id>/<epoch>-<worker id>.json``; the worker id is a
+    random per-process id, so a reused PID never overwrites another worker's file.
+    ``update`` only touches memory: a daemon thread writes the files every
+    ``flush_seconds`` (0 disables it; call ``flush`` directly). ``report`` merges
+    the files of the latest ``window_epochs`` epochs and deletes older ones.
+    """
+
+    def __init__(self, reference, directory, flush_seconds=FLUSH_SECONDS,
+                 epoch_seconds=EPOCH_SECONDS, window_epochs=WINDOW_EPOCHS, clock=time.time):
+        self.reference = reference
+        self.directory = os.path.join(directory, reference.fingerprint)
+        self.flush_seconds = flush_seconds
+        self.epoch_seconds = epoch_seconds
+        self.window_epochs = window_epochs
+        self.clock = clock
+        self.current = reference.empty_like()
+        self._epoch = self._now_epoch()
+        self._pid = None
+        self._worker_id = None
+        # Finished epochs waiting to be written, and whether current changed since the last write
+        self._finished = []
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+        self._stop = threading.Event()
+
+    def _now_epoch(self):
+        return int(self.clock() // self.epoch_seconds)
+
+    @property
+    def worker_id(self):
+        # Regenerated after a fork so parent and child never share a file
+        if self._pid != os.getpid():
+            self._pid, self._worker_id = os.getpid(), uuid.uuid4().hex[:12]
+        return self._worker_id
+
+    def _path(self, epoch):
+        return os.path.join(self.directory, f'{epoch}-{self.worker_id}.json')
+
+    def _rollover(self):
+        """Start a new sketch when the epoch changed, queueing the finished one for writing"""
+        epoch = self._now_epoch()
+        if epoch != self._epoch:
+            if self._dirty:
+                self._finished.append((self._epoch, self.current))
+            self.current, self._epoch, self._dirty = self.reference.empty_like(), epoch, False
+
+    def _ensure_flusher(self):
+        # Started lazily, so every forked worker runs its own flusher
+        if not self.flush_seconds or self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        threading.Thread(target=self._flush_loop, name='drift-flush', daemon=True).start()
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_seconds):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Drift flush failed")
+
+    def update(self, row, probability):
+        """Record one scored transaction (in memory; the flusher thread writes it out)"""
+        self._ensure_flusher()
+        with self._lock:
+            self._rollover()
+            self.current.update(row, probability)
+            self._dirty = True
+
+    def _save(self, epoch, sketch):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            sketch.save(self._path(epoch))
+        except OSError as e:
+            logger.warning(f"Could not flush drift sketch: {e}")
+
+    def flush(self):
+        """Write finished epochs and the current counts, if they changed"""
+        with self._lock:
+            self._rollover()
+            finished, self._finished = self._finished, []
+            snapshot = DriftSketch.from_dict(self.current.to_dict()) if self._dirty else None
+            epoch = self._epoch
+            self._dirty = False
+        for finished_epoch, sketch in finished:
+            self._save(finished_epoch, sketch)
+        if snapshot is not None:
+            self._save(epoch, snapshot)
+
+    def close(self):
+        """Stop the flusher thread and write what is left"""
+        self._stop.set()
+        self.flush()
+
+    def merged(self):
+        """Every worker's last flush within the window, this worker's live counts included"""
+        self.flush()
+        oldest = self._now_epoch() - self.window_epochs + 1
+        merged = self.reference.empty_like()
+        if not os.path.isdir(self.directory):
+            return merged
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                epoch = int(name.split('-', 1)[0])
+            except ValueError:
+                continue  # Not a worker file (e.g. an in-progress .tmp)
+            try:
+                if epoch < oldest:
+                    os.remove(path)
+                else:
+                    merged.merge(DriftSketch.load(path))
+            except FileNotFoundError:
+                continue  # Another worker expired it first
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Skipping drift sketch {name}: {e}")
+        return merged
+
+    def report(self):
+        report = drift_report(self.reference, self.merged())
+        report['window_seconds'] = self.window_epochs * self.epoch_seconds
+        return report
@@ -0,0 +1,220 @@
+import logging
+import numpy as np
+
+from rules import TIER_NAMES, TIER_THRESHOLDS, tier_index
+
+logger = logging.getLogger(__name__)
+
+# Threshold grid for the confusion sweep (always includes 0.3, 0.5 and 0.7)
+DEFAULT_THRESHOLDS = tuple(np.round(np.arange(0.05, 1.0, 0.05), 2))
+# Resolution of the score histogram behind ROC-AUC / PR-AUC
+SCORE_BINS = 10000
+DEFAULT_CHUNK_SIZE = 250000
+
+
+def _safe_div(num, den):
+    """Element-wise division returning nan where the denominator is zero"""
+    num = np.asarray(num, dtype=np.float64)
+    den = np.asarray(den, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(den > 0, num / np.where(den > 0, den, 1), np.nan)
+
+
+def _to_builtin(value):
+    """Convert numpy scalars/nan into JSON-friendly python values"""
+    if isinstance(value, dict):
+        return {k: _to_builtin(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_builtin(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return _to_builtin(value.tolist())
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        return None if np.isnan(value) else float(value)
+    return value
+
+
+class StreamingEvaluator:
+    """Accumulate fixed-size score histograms over scored chunks.
+
+    Memory is O(len(thresholds) + score_bins) regardless of how many rows
+    are fed through ``update``; every metric is derived from the histograms
+    in ``finalize``.
+    """
+
+    def __init__(self, thresholds=DEFAULT_THRESHOLDS, score_bins=SCORE_BINS):
+        self.thresholds = np.unique(np.append(np.asarray(thresholds, dtype=np.float64), 0.5))
+        self.score_bins = int(score_bins)
+        n_slots = len(self.thresholds) + 1
+        # Rows bucketed by how many grid thresholds their score clears
+        self._cleared_pos = np.zeros(n_slots, dtype=np.int64)
+        self._cleared_neg = np.zeros(n_slots, dtype=np.int64)
+        self._hist_pos = np.zeros(self.score_bins, dtype=np.int64)
+        self._hist_neg = np.zeros(self.score_bins, dtype=np.int64)
+        self._tier_pos = np.zeros(len(TIER_NAMES), dtype=np.int64)
+        self._tier_neg = np.zeros(len(TIER_NAMES), dtype=np.int64)
+
+    def update(self, y_true, y_score):
+        """Fold one chunk of labels and fraud probabilities into the histograms"""
+        y_true = np.asarray(y_true).astype(bool, copy=False)
+        y_score = np.clip(np.asarray(y_score, dtype=np.float64), 0.0, 1.0)
+        if y_true.shape != y_score.shape:
+            raise ValueError("y_true and y_score must have the same shape")
+
+        # side='left' counts thresholds strictly below the score, i.e. score > t
+        cleared = np.searchsorted(self.thresholds, y_score, side='left')
+        bins = np.minimum((y_score * self.score_bins).astype(np.int64), self.score_bins - 1)
+        tiers = tier_index(y_score)
+
+        for mask, cleared_acc, hist_acc, tier_acc in (
+            (y_true, self._cleared_pos, self._hist_pos, self._tier_pos),
+            (~y_true, self._cleared_neg, self._hist_neg, self._tier_neg),
+        ):
+            cleared_acc += np.bincount(cleared[mask], minlength=len(cleared_acc))
+            hist_acc += np.bincount(bins[mask], minlength=self.score_bins)
+            tier_acc += np.bincount(tiers[mask], minlength=len(TIER_NAMES))
+        return self
+
+    def confusion(self):
+        """Return tp, fp, tn, fn arrays aligned with ``self.thresholds``"""
+        # Positives predicted at threshold j are the rows clearing more than j thresholds
+        tp = np.cumsum(self._cleared_pos[::-1])[::-1][1:]
+        fp = np.cumsum(self._cleared_neg[::-1])[::-1][1:]
+        n_pos = self._cleared_pos.sum()
+        n_neg = self._cleared_neg.sum()
+        return tp, fp, n_neg - fp, n_pos - tp
+
+    def _auc_scores(self):
+        """ROC-AUC and average precision from the descending score histogram"""
+        pos = self._hist_pos[::-1]
+        neg = self._hist_neg[::-1]
+        n_pos, n_neg = pos.sum(), neg.sum()
+        if n_pos == 0 or n_neg == 0:
+            return np.nan, np.nan
+        tp = np.cumsum(pos)
+        fp = np.cumsum(neg)
+        # Rows sharing a bin are treated as ties (linear interpolation)
+        tpr = np.concatenate(([0.0], tp / n_pos))
+        fpr = np.concatenate(([0.0], fp / n_neg))
+        auc_roc = float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+        precision = _safe_div(tp, tp + fp)
+        auc_pr = float(np.sum(np.where(pos > 0, pos / n_pos * np.nan_to_num(precision), 0.0)))
+        return auc_roc, auc_pr
+
+    def _classification_report(self, threshold=0.5):
+        """sklearn-style classification report at a single grid threshold"""
+        j = int(np.flatnonzero(np.isclose(self.thresholds, threshold))[0])
+        tp, fp, tn, fn = (int(a[j]) for a in self.confusion())
+        report = {}
+        for label, (hit, false_alarm, miss) in (('0', (tn, fn, fp)), ('1', (tp, fp, fn))):
+            precision = float(_safe_div(hit, hit + false_alarm))
+            recall = float(_safe_div(hit, hit + miss))
+            report[label] = {
+                'precision': precision,
+                'recall': recall,
+                'f1-score': float(_safe_div(2 * precision * recall, precision + recall)),
+                'support': hit + miss,
+            }
+        total = tp + fp + tn + fn
+        report['accuracy'] = float(_safe_div(tp + tn, total))
+        for avg, weights in (('macro avg', (1, 1)), ('weighted avg', (tn + fp, tp + fn))):
+            report[avg] = {
+                key: float(np.average([report['0'][key], report['1'][key]], weights=weights))
+                if sum(weights) else np.nan
+                for key in ('precision', 'recall', 'f1-score')
+            }
+            report[avg]['support'] = total
+        return report
+
+    def finalize(self):
+        """Compute the metrics dict written to models/model_metrics_<ts>.json"""
+        tp, fp, tn, fn = self.confusion()
+        precision = _safe_div(tp, tp + fp)
+        recall = _safe_div(tp, tp + fn)
+        f1 = _safe_div(2 * precision * recall, precision + recall)
+        fpr = _safe_div(fp, fp + tn)
+        sweep = [
+            {
+                'threshold': float(t),
+                'tp': tp[j], 'fp': fp[j], 'tn': tn[j], 'fn': fn[j],
+                'precision': precision[j], 'recall': recall[j],
+                'f1': f1[j], 'fpr': fpr[j],
+            }
+            for j, t in enumerate(self.thresholds)
+        ]
+
+        n_pos = self._tier_pos.sum()
+        tiers = {}
+        for i, name in enumerate(TIER_NAMES):
+            count = self._tier_pos[i] + self._tier_neg[i]
+            tiers[name] = {
+                'count': count,
+                'frauds': self._tier_pos[i],
+                # Share of the tier that is fraud / share of all fraud landing in the tier
+                'precision': _safe_div(self._tier_pos[i], count),
+                'recall': _safe_div(self._tier_pos[i], n_pos),
+            }
+
+        auc_roc, auc_pr = self._auc_scores()
+        return _to_builtin({
+            'n_samples': n_pos + self._tier_neg.sum(),
+            'n_positive': n_pos,
+            'auc_roc': auc_roc,
+            'auc_pr': auc_pr,
+            'tier_thresholds': list(TIER_THRESHOLDS),
+            'tiers': tiers,
+            'thresholds': sweep,
+            'classification_report': self._classification_report(0.5),
+        })
+
+
+def iter_chunks(X, y, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield (X, y) row slices of an in-memory test set without copying it"""
+    for start in range(0, len(X), chunk_size):
+        stop = start + chunk_size
+        if hasattr(X, 'iloc'):
+            yield X.iloc[start:stop], y.iloc[start:stop]
+        else:
+            yield X[start:stop], y[start:stop]
+
+
+def evaluate_chunks(model, chunks, thresholds=DEFAULT_THRESHOLDS):
+    """Score an iterable of (X, y) chunks once each and return the metrics dict"""
+    evaluator = StreamingEvaluator(thresholds)
+    for i, (X_chunk, y_chunk) in enumerate(chunks, 1):
+        evaluator.update(y_chunk, model.predict_proba(X_chunk)[:, 1])
+        logger.info(f"Evaluated chunk {i}")
+    return evaluator.finalize()
+
+
+def _fmt(value):
+    """Format an optional metric for logging"""
+    return 'n/a' if value is None else f"{value:.4f}"
+
+
+def format_metrics(metrics):
+    """Render the threshold sweep and tier table for the training log"""
+    lines = [f"{'threshold':>9} {'precision':>9} {'recall':>7} {'f1':>7} {'fp':>9} {'fn':>7}"]
+    for row in metrics['thresholds']:
+        lines.append(
+            f"{row['threshold']:>9.2f} {_fmt(row['precision']):>9} {_fmt(row['recall']):>7} "
+            f"{_fmt(row['f1']):>7} {row['fp']:>9} {row['fn']:>7}"
+        )
+    lines.append("")
+    for name, tier in metrics['tiers'].items():
+        lines.append(
+            f"{name:<6} count={tier['count']:<9} frauds={tier['frauds']:<7} "
+            f"precision={_fmt(tier['precision'])} recall={_fmt(tier['recall'])}"
+        )
+    return "\n".join(lines)
+
+
+def evaluate_model(model, X_test, y_test, chunk_size=DEFAULT_CHUNK_SIZE, thresholds=DEFAULT_THRESHOLDS):
+    """Generate comprehensive evaluation metrics in a single chunked scoring pass"""
+    metrics = evaluate_chunks(model, iter_chunks(X_test, y_test, chunk_size), thresholds)
+
+    logger.info("\nThreshold sweep:\n" + format_metrics(metrics))
+    logger.info(f"\nAUC-ROC: {_fmt(metrics['auc_roc'])}")
+    logger.info(f"\nAUC-PR: {_fmt(metrics['auc_pr'])}")
+    return metrics
@@ -0,0 +1,104 @@
+import json
+import logging
+from functools import lru_cache
+import numpy as np
+
+from features import FEATURE_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+IMPORTANCE_FILE = 'feature_importance.json'
+IMPORTANCE_SAMPLE_ROWS = 50000
+EXPLANATION_CACHE_SIZE = 4096
+
+
+class Explainer:
+    """Per-transaction feature attributions from the booster's tree contributions.
+
+    Contributions are in log-odds (margin) space: for every row they sum with
+    the bias to the model's raw score, so positive values push towards fraud.
+    """
+
+    def __init__(self, model, cache_size=EXPLANATION_CACHE_SIZE):
+        self.booster = model.get_booster()
+        self.feature_names = list(self.booster.feature_names or FEATURE_COLUMNS)
+        self._explain_cached = lru_cache(maxsize=cache_size)(self._explain_key)
+
+    def contributions(self, X):
+        """Contribution matrix of shape (n_rows, n_features + 1); the last column is the bias"""
+        # Imported on first use; the booster itself was loaded with the model
+        import xgboost as xgb
+        dmatrix = xgb.DMatrix(
+            np.ascontiguousarray(X, dtype=np.float32),
+            feature_names=self.booster.feature_names
+        )
+        return self.booster.predict(dmatrix, pred_contribs=True)
+
+    def explain_batch(self, X, top_k=None):
+        """Explain many rows with a single booster call.
+
+        Returns one dict per row with the bias and a list of per-feature
+        contributions, ordered by absolute impact and cut to ``top_k``.
+        """
+        if top_k is not None and (isinstance(top_k, bool) or not isinstance(top_k, int) or top_k < 1):
+            raise ValueError(f"top_k must be a positive integer, got {top_k!r}")
+        contribs = self.contributions(X)
+        values, bias = contribs[:, :-1], contribs[:, -1]
+        order = np.argsort(-np.abs(values), axis=1)
+        if top_k is not None:
+            order = order[:, :top_k]
+        names = np.asarray(self.feature_names)
+        ranked = np.take_along_axis(values, order, axis=1)
+        return [
+            {
+                'bias': float(bias[i]),
+                'contributions': [
+                    {'feature': name, 'value': value}
+                    for name, value in zip(names[order[i]].tolist(), ranked[i].tolist())
+                ],
+            }
+            for i in range(len(contribs))
+        ]
+
+    def _explain_key(self, key):
+        return self.explain_batch(np.asarray(key, dtype=np.float32).reshape(1, -1))[0]
+
+    def explain(self, row):
+        """Explain a single transaction row, memoised on the row values"""
+        explanation = self._explain_cached(tuple(float(v) for v in np.ravel(row)))
+        return {
+            'bias': explanation['bias'],
+            'contributions': [dict(item) for item in explanation['contributions']],
+        }
+
+
+def compute_global_importance(model, X, max_rows=IMPORTANCE_SAMPLE_ROWS, random_state=42):
+    """Mean absolute contribution per feature over (a sample of) X, normalised to sum to 1"""
+    if len(X) > max_rows:
+        rows = np.random.default_rng(random_state).choice(len(X), size=max_rows, replace=False)
+        X = X.iloc[np.sort(rows)] if hasattr(X, 'iloc') else X[np.sort(rows)]
+    explainer = Explainer(model)
+    mean_abs = np.abs(explainer.contributions(X)[:, :-1]).mean(axis=0)
+    total = mean_abs.sum()
+    shares = mean_abs / total if total > 0 else mean_abs
+    importance = dict(sorted(
+        zip(explainer.feature_names, shares.tolist()),
+        key=lambda item: item[1], reverse=True
+    ))
+    logger.info(f"Global feature importance over {len(X)} rows: {importance}")
+    return importance
+
+
+def save_global_importance(importance, path):
+    with open(path, 'w') as f:
+        json.dump(importance, f, indent=2)
+    return path
+
+
+def load_global_importance(path):
+    """Load precomputed global importances, or None when they were not saved"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
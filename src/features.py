@@ -0,0 +1,102 @@
+import sys
+import numpy as np
+
+# Model input columns, in the order the booster was trained on
+FEATURE_COLUMNS = [
+    'step',
+    'type',
+    'amount',
+    'oldbalanceOrg',
+    'newbalanceOrg',
+    'oldbalanceDest',
+    'newbalanceDest',
+]
+TARGET_COLUMN = 'isFraud'
+# Raw PaySim headers (onlinefraud.csv) that differ from the feature names above
+RAW_COLUMN_ALIASES = {'newbalanceOrig': 'newbalanceOrg'}
+
+# Narrowest safe dtype for every processed column. Steps are hours (< 32768),
+# type is a small code, money fits float32's ~7 significant digits.
+FEATURE_DTYPES = {
+    'step': np.dtype(np.int16),
+    'type': np.dtype(np.int8),
+    'amount': np.dtype(np.float32),
+    'oldbalanceOrg': np.dtype(np.float32),
+    'newbalanceOrg': np.dtype(np.float32),
+    'oldbalanceDest': np.dtype(np.float32),
+    'newbalanceDest': np.dtype(np.float32),
+}
+SCHEMA = {**FEATURE_DTYPES, TARGET_COLUMN: np.dtype(np.bool_)}
+# CSV stores the label as 0/1, so it is parsed as int8 and converted afterwards
+CSV_DTYPES = {col: (np.dtype(np.int8) if dtype == np.bool_ else dtype) for col, dtype in SCHEMA.items()}
+
+# Transaction type encoding. Alphabetical, matching the LabelEncoder codes that
+# preprocess.py has always written, so existing models keep their meaning.
+TYPE_MAP = {'CASH_IN': 0, 'CASH_OUT': 1, 'DEBIT': 2, 'PAYMENT': 3, 'TRANSFER': 4}
+
+
+def encode_types(types):
+    """Map transaction type names to their int8 codes, rejecting unknown names"""
+    import pandas as pd
+    types = pd.Series(types).astype(str)
+    codes = types.map(TYPE_MAP)
+    if codes.isna().any():
+        unknown = sorted(types[codes.isna()].unique())
+        raise ValueError(f"Unknown transaction types: {', '.join(unknown)}")
+    return codes.astype(np.int8)
+
+
+def rename_raw_columns(df):
+    """Rename raw PaySim headers to the feature schema names (in place)"""
+    renames = {raw: name for raw, name in RAW_COLUMN_ALIASES.items() if raw in df and name not in df}
+    if renames:
+        df.rename(columns=renames, inplace=True)
+    return df
+
+
+def coerce_frame(df, columns=None):
+    """Cast schema columns to their declared dtypes, checking that values fit"""
+    columns = [c for c in (columns or SCHEMA) if c in df]
+    for col in columns:
+        dtype = SCHEMA[col]
+        values = df[col]
+        if values.dtype == dtype:
+            continue
+        if dtype.kind == 'i':
+            info = np.iinfo(dtype)
+            if len(values) and (values.min() < info.min or values.max() > info.max):
+                raise ValueError(f"Column {col!r} has values outside the {dtype} range")
+        elif dtype.kind == 'f' and not np.isfinite(values.to_numpy(dtype=np.float64)).all():
+            raise ValueError(f"Column {col!r} has non-finite values")
+        df[col] = values.astype(dtype)
+    return df
+
+
+def validate_frame(df, require_target=False):
+    """Boundary check: required columns present with exactly the declared dtypes"""
+    required = FEATURE_COLUMNS + ([TARGET_COLUMN] if require_target else [])
+    missing = [c for c in required if c not in df]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+    wrong = {c: str(df[c].dtype) for c in required if c in SCHEMA and df[c].dtype != SCHEMA[c]}
+    if wrong:
+        raise TypeError(f"Columns do not match the feature schema: {wrong}")
+    return df
+
+
+def read_processed_csv(filepath, **kwargs):
+    """Read processed data straight into the compact schema dtypes"""
+    import pandas as pd
+    df = pd.read_csv(filepath, dtype=CSV_DTYPES, **kwargs)
+    if isinstance(df, pd.DataFrame):
+        return coerce_frame(df)
+    return (coerce_frame(chunk) for chunk in df)
+
+
+def to_matrix(X):
+    """Contiguous float32 model input matrix in FEATURE_COLUMNS order"""
+    # pandas is only imported by callers that build frames, so a frame implies it is loaded
+    pd = sys.modules.get('pandas')
+    if pd is not None and isinstance(X, pd.DataFrame):
+        X = X[FEATURE_COLUMNS].to_numpy(dtype=np.float32)
+    return np.ascontiguousarray(X, dtype=np.float32).reshape(-1, len(FEATURE_COLUMNS))
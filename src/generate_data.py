@@ -0,0 +1,181 @@
+import argparse
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Configure paths
+BASE_DIR = Path(__file__).parent.parent
+SYNTHETIC_DATA = BASE_DIR / 'data/raw/synthetic_transactions.csv'
+
+logger = logging.getLogger(__name__)
+
+# Raw PaySim schema, in file order (the raw header really does say newbalanceOrig)
+RAW_COLUMNS = [
+    'step', 'type', 'amount', 'nameOrig', 'oldbalanceOrg', 'newbalanceOrig',
+    'nameDest', 'oldbalanceDest', 'newbalanceDest', 'isFraud', 'isFlaggedFraud'
+]
+TYPES = np.array(['CASH_OUT', 'PAYMENT', 'CASH_IN', 'TRANSFER', 'DEBIT'])
+CASH_OUT, PAYMENT, CASH_IN, TRANSFER, DEBIT = range(len(TYPES))
+# Type mix and log-normal amount parameters roughly matching onlinefraud.csv
+TYPE_MIX = np.array([0.3517, 0.3381, 0.2199, 0.0838, 0.0065])
+AMOUNT_LOG_MEAN = np.array([11.7, 8.8, 11.5, 12.6, 8.2])
+AMOUNT_LOG_SIGMA = np.array([1.0, 1.0, 1.1, 1.3, 1.0])
+
+DEFAULT_FRAUD_RATE = 0.00129
+# Fraud only happens on TRANSFER/CASH_OUT, so the overall rate cannot exceed their share
+MAX_FRAUD_RATE = float(TYPE_MIX[TRANSFER] + TYPE_MIX[CASH_OUT])
+MAX_STEP = 743
+# ~19 MB of CSV text per chunk; at most 2 * workers chunks wait in memory
+CHUNK_SIZE = 250000
+MAX_WORKERS = 8
+FLAG_THRESHOLD = 200000
+# Share of accounts showing zero balances, a well-known PaySim quirk
+ZERO_ORIG_BALANCE = 0.33
+ZERO_DEST_BALANCE = 0.42
+FRAUD_EMPTY_DEST = 0.5
+
+
+def _account_ids(rng, n, pool_size, prefix):
+    """Draw account names from a fixed pool with a skew, so busy accounts recur"""
+    ids = (pool_size * rng.random(n) ** 2).astype(np.int64) + 1000000000
+    return np.char.add(prefix, ids.astype('U10'))
+
+
+def check_arguments(n_rows, fraud_rate=DEFAULT_FRAUD_RATE, **kwargs):
+    """Raise ValueError for a row count or fraud rate the generator cannot produce"""
+    if n_rows < 1:
+        raise ValueError(f"n_rows must be at least 1, got {n_rows}")
+    if not 0 <= fraud_rate <= MAX_FRAUD_RATE:
+        raise ValueError(f"fraud_rate must be between 0 and {MAX_FRAUD_RATE:.4f}, got {fraud_rate}")
+
+
+def generate_chunk(rng, start, n, total_rows, fraud_rate=DEFAULT_FRAUD_RATE, max_step=MAX_STEP):
+    """Generate rows [start, start + n) of a synthetic dataset as a DataFrame"""
+    check_arguments(total_rows, fraud_rate)
+    # Rows are ordered by step, as in the original extract
+    step = 1 + (np.arange(start, start + n, dtype=np.int64) * max_step) // total_rows
+    tx_type = rng.choice(len(TYPES), size=n, p=TYPE_MIX)
+
+    # Fraud only happens on TRANSFER/CASH_OUT; scale so the overall rate is fraud_rate
+    candidate = (tx_type == TRANSFER) | (tx_type == CASH_OUT)
+    is_fraud = candidate & (rng.random(n) < fraud_rate / MAX_FRAUD_RATE)
+
+    amount = np.round(rng.lognormal(AMOUNT_LOG_MEAN[tx_type], AMOUNT_LOG_SIGMA[tx_type]), 2)
+
+    # Origin account: cash-in credits the sender, everything else debits it
+    old_orig = np.where(
+        rng.random(n) < ZERO_ORIG_BALANCE, 0.0,
+        np.round(rng.lognormal(10.5, 2.0, n), 2)
+    )
+    # Fraud drains the whole origin balance
+    old_orig = np.where(is_fraud & (old_orig == 0), amount, old_orig)
+    amount = np.where(is_fraud, old_orig, amount)
+    new_orig = np.where(tx_type == CASH_IN, old_orig + amount, np.maximum(old_orig - amount, 0.0))
+
+    # Destination account: merchants (PAYMENT) report no balances
+    merchant = tx_type == PAYMENT
+    old_dest = np.where(
+        merchant | (rng.random(n) < ZERO_DEST_BALANCE), 0.0,
+        np.round(rng.lognormal(11.5, 2.0, n), 2)
+    )
+    new_dest = np.where(tx_type == CASH_IN, np.maximum(old_dest - amount, 0.0), old_dest + amount)
+    new_dest = np.where(merchant, 0.0, new_dest)
+    empty_dest = is_fraud & (rng.random(n) < FRAUD_EMPTY_DEST)
+    old_dest = np.where(empty_dest, 0.0, old_dest)
+    new_dest = np.where(empty_dest, 0.0, new_dest)
+
+    customers = max(1000, total_rows // 2)
+    name_dest = np.where(
+        merchant,
+        _account_ids(rng, n, max(100, total_rows // 5), 'M'),
+        _account_ids(rng, n, customers, 'C')
+    )
+
+    return pd.DataFrame({
+        'step': step,
+        'type': TYPES[tx_type],
+        'amount': amount,
+        'nameOrig': _account_ids(rng, n, customers, 'C'),
+        'oldbalanceOrg': old_orig,
+        'newbalanceOrig': np.round(new_orig, 2),
+        'nameDest': name_dest,
+        'oldbalanceDest': old_dest,
+        'newbalanceDest': np.round(new_dest, 2),
+        'isFraud': is_fraud.astype(np.int8),
+        'isFlaggedFraud': (is_fraud & (tx_type == TRANSFER) & (amount > FLAG_THRESHOLD)).astype(np.int8),
+    }, columns=RAW_COLUMNS)
+
+
+def generate_chunks(n_rows, chunk_size=CHUNK_SIZE, seed=42, **kwargs):
+    """Yield DataFrame chunks; output depends only on (n_rows, chunk_size, seed, kwargs)"""
+    check_arguments(n_rows, **kwargs)
+    for index, start in enumerate(range(0, n_rows, chunk_size)):
+        rng = np.random.default_rng([seed, index])
+        yield generate_chunk(rng, start, min(chunk_size, n_rows - start), n_rows, **kwargs)
+
+
+def _render_chunk(index, start, n, n_rows, seed, kwargs):
+    """Generate one chunk and format it as CSV text (runs in a worker process)"""
+    chunk = generate_chunk(np.random.default_rng([seed, index]), start, n, n_rows, **kwargs)
+    return chunk.to_csv(header=(index == 0), index=False), int(chunk['isFraud'].sum())
+
+
+def generate_csv(output_file=SYNTHETIC_DATA, n_rows=100000, chunk_size=CHUNK_SIZE, seed=42,
+                 workers=None, **kwargs):
+    """Stream a synthetic dataset in the raw onlinefraud.csv schema to disk.
+
+    CSV formatting dominates the cost, so chunks are generated and formatted in
+    worker processes and written in order; at most 2 * workers chunks are in flight,
+    so workers defaults to at most MAX_WORKERS to bound memory on large machines.
+    The output is identical to concatenating ``generate_chunks`` for any worker count.
+    """
+    check_arguments(n_rows, **kwargs)
+    output_file = Path(output_file)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    workers = workers or min(os.cpu_count() or 1, MAX_WORKERS)
+    started = time.perf_counter()
+    frauds = 0
+    starts = enumerate(range(0, n_rows, chunk_size))
+    with ProcessPoolExecutor(max_workers=workers) as pool, open(output_file, 'w', newline='') as f:
+        pending = deque()
+        for index, start in starts:
+            pending.append(pool.submit(
+                _render_chunk, index, start, min(chunk_size, n_rows - start), n_rows, seed, kwargs
+            ))
+            if len(pending) < 2 * workers:
+                continue
+            text, chunk_frauds = pending.popleft().result()
+            f.write(text)
+            frauds += chunk_frauds
+            logger.info(f"Wrote {f.tell():,} bytes")
+        while pending:
+            text, chunk_frauds = pending.popleft().result()
+            f.write(text)
+            frauds += chunk_frauds
+    elapsed = time.perf_counter() - started
+    print(f"✅ Generated {n_rows:,} rows ({frauds:,} fraud) in {elapsed:.1f}s. Output at: {output_file}")
+    return output_file
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Generate synthetic PaySim-style transactions")
+    parser.add_argument('--rows', type=int, default=100000, help="Number of rows to generate")
+    parser.add_argument('--output', type=Path, default=SYNTHETIC_DATA, help="Output CSV path")
+    parser.add_argument('--fraud-rate', type=float, default=DEFAULT_FRAUD_RATE, help="Share of fraudulent rows")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Rows generated per chunk")
+    parser.add_argument('--max-step', type=int, default=MAX_STEP, help="Number of hourly steps covered")
+    parser.add_argument('--workers', type=int, default=None, help=f"Worker processes (default: CPUs, at most {MAX_WORKERS})")
+    args = parser.parse_args()
+    try:
+        check_arguments(args.rows, args.fraud_rate)
+    except ValueError as e:
+        parser.error(str(e))
+    generate_csv(args.output, args.rows, args.chunk_size, args.seed, args.workers,
+                 fraud_rate=args.fraud_rate, max_step=args.max_step)
@@ -0,0 +1,125 @@
+import json
+import logging
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from features import read_processed_csv
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = 'manifest.json'
+# One partition per simulated day (steps are hours)
+STEP_WIDTH = 24
+WINDOW_CHUNK_SIZE = 200000
+
+
+def partition_name(start, end):
+    return f'step={start:04d}-{end:04d}.csv'
+
+
+class PartitionWriter:
+    """Append processed chunks into CSV files keyed by step range, then write a manifest"""
+
+    def __init__(self, out_dir, step_width=STEP_WIDTH):
+        self.out_dir = Path(out_dir)
+        self.step_width = step_width
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        # Start from a clean layout so stale partitions never leak into a manifest
+        for old in self.out_dir.glob('step=*.csv'):
+            old.unlink()
+        (self.out_dir / MANIFEST_FILE).unlink(missing_ok=True)
+        self.columns = None
+        self._partitions = {}
+
+    def write(self, chunk, target_column='isFraud'):
+        if self.columns is None:
+            self.columns = list(chunk.columns)
+        keys = (chunk['step'].to_numpy() - 1) // self.step_width
+        for key in np.unique(keys):
+            part = chunk[keys == key]
+            start = int(key) * self.step_width + 1
+            stats = self._partitions.get(start)
+            if stats is None:
+                stats = self._partitions[start] = {
+                    'path': partition_name(start, start + self.step_width - 1),
+                    'step_start': start,
+                    'step_end': start + self.step_width - 1,
+                    'step_min': int(part['step'].min()),
+                    'step_max': int(part['step'].max()),
+                    'rows': 0,
+                    'frauds': 0,
+                }
+            part.to_csv(self.out_dir / stats['path'], mode='a', header=(stats['rows'] == 0), index=False)
+            stats['step_min'] = min(stats['step_min'], int(part['step'].min()))
+            stats['step_max'] = max(stats['step_max'], int(part['step'].max()))
+            stats['rows'] += len(part)
+            if target_column in part:
+                stats['frauds'] += int(part[target_column].sum())
+
+    def close(self):
+        manifest = {
+            'step_width': self.step_width,
+            'columns': self.columns,
+            'partitions': [self._partitions[k] for k in sorted(self._partitions)],
+        }
+        with open(self.out_dir / MANIFEST_FILE, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        logger.info(f"Wrote {len(self._partitions)} step partitions to {self.out_dir}")
+        return manifest
+
+
+def load_manifest(partitions_dir):
+    manifest_path = Path(partitions_dir) / MANIFEST_FILE
+    if not manifest_path.exists():
+        raise FileNotFoundError(f"Partition manifest {manifest_path} not found. Run preprocess.py first")
+    with open(manifest_path) as f:
+        return json.load(f)
+
+
+def select_partitions(manifest, start_step=None, end_step=None):
+    """Partitions whose steps overlap [start_step, end_step]; everything else is pruned"""
+    return [
+        p for p in manifest['partitions']
+        if (start_step is None or p['step_max'] >= start_step)
+        and (end_step is None or p['step_min'] <= end_step)
+    ]
+
+
+def iter_window_chunks(partitions_dir, start_step=None, end_step=None, columns=None, chunksize=WINDOW_CHUNK_SIZE):
+    """Stream the rows with start_step <= step <= end_step, reading only overlapping partitions"""
+    partitions_dir = Path(partitions_dir)
+    selected = select_partitions(load_manifest(partitions_dir), start_step, end_step)
+    usecols = None if columns is None else list(dict.fromkeys(list(columns) + ['step']))
+    for partition in selected:
+        # Partitions fully inside the window need no row filter
+        inside = ((start_step is None or partition['step_min'] >= start_step)
+                  and (end_step is None or partition['step_max'] <= end_step))
+        for chunk in read_processed_csv(partitions_dir / partition['path'], usecols=usecols, chunksize=chunksize):
+            if not inside:
+                steps = chunk['step']
+                mask = np.ones(len(chunk), dtype=bool)
+                if start_step is not None:
+                    mask &= (steps >= start_step).to_numpy()
+                if end_step is not None:
+                    mask &= (steps <= end_step).to_numpy()
+                chunk = chunk[mask]
+            yield chunk if columns is None else chunk[list(columns)]
+
+
+def read_window(partitions_dir, start_step=None, end_step=None, columns=None):
+    """Load a step window into memory, in the compact schema dtypes"""
+    chunks = list(iter_window_chunks(partitions_dir, start_step, end_step, columns))
+    if not chunks:
+        raise ValueError(f"No rows between steps {start_step} and {end_step}")
+    return pd.concat(chunks, ignore_index=True)
+
+
+def sliding_windows(first_step, last_step, train_steps, test_steps, stride=None):
+    """Yield ((train_start, train_end), (test_start, test_end)) out-of-time windows"""
+    stride = stride or test_steps
+    start = first_step
+    while start + train_steps + test_steps - 1 <= last_step:
+        train = (start, start + train_steps - 1)
+        yield train, (train[1] + 1, train[1] + test_steps)
+        start += stride
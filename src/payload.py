@@ -0,0 +1,191 @@
+import json
+import re
+import threading
+from collections import namedtuple
+from datetime import datetime
+import numpy as np
+
+from features import FEATURE_COLUMNS, FEATURE_DTYPES, TYPE_MAP
+
+try:
+    import orjson
+except ImportError:  # Optional speed-up; the stdlib encoder is the fallback
+    orjson = None
+
+FLOAT32_MAX = float(np.finfo(np.float32).max)
+# ASCII digits only; str.isdigit() also accepts characters such as '²' that int() rejects
+INTEGER_PATTERN = re.compile(r'[+-]?[0-9]+')
+
+# One entry per accepted request field, in parse order. kind picks the parser,
+# default applies when the field is absent (an explicit null is an error).
+Field = namedtuple('Field', ['name', 'kind', 'default'])
+
+TRANSACTION_SCHEMA = (
+    Field('step', 'int', 1),
+    Field('type', 'type', 'PAYMENT'),
+    Field('amount', 'money', 0.0),
+    Field('oldbalanceOrg', 'money', 0.0),
+    Field('newbalanceOrg', 'money', 0.0),
+    Field('oldbalanceDest', 'money', 0.0),
+    Field('newbalanceDest', 'money', 0.0),
+    Field('sender', 'text', ''),
+    Field('recipient', 'text', ''),
+)
+
+
+class PayloadError(ValueError):
+    """Request body failed validation; errors maps each bad field to a message"""
+
+    def __init__(self, errors):
+        super().__init__('; '.join(f'{name}: {message}' for name, message in errors.items()))
+        self.errors = errors
+
+
+def _parse_money(value):
+    if type(value) is not float:
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            raise ValueError('must be a number')
+        try:
+            value = float(value)
+        except ValueError:
+            raise ValueError('must be a number') from None
+    # Also rejects NaN, which fails every comparison
+    if not -FLOAT32_MAX <= value <= FLOAT32_MAX:
+        raise ValueError('must be a finite number')
+    return value
+
+
+def _int_parser(dtype):
+    info = np.iinfo(dtype)
+    low, high = int(info.min), int(info.max)
+
+    def parse(value):
+        if type(value) is not int:
+            if isinstance(value, float) and value.is_integer():
+                value = int(value)
+            elif isinstance(value, str) and INTEGER_PATTERN.fullmatch(value.strip()):
+                value = int(value)
+            else:
+                raise ValueError('must be an integer')
+        if not low <= value <= high:
+            raise ValueError(f'must be between {low} and {high}')
+        return value
+    return parse
+
+
+def _parse_type(value):
+    if value not in TYPE_MAP:
+        raise ValueError(f"must be one of {', '.join(TYPE_MAP)}")
+    return value
+
+
+def _parse_text(value):
+    if not isinstance(value, str):
+        raise ValueError('must be a string')
+    return value
+
+
+class TransactionParser:
+    """Request schema compiled once into per-field steps that fill a float32 feature row.
+
+    ``parse`` returns the model input row and the parsed fields (for the rule
+    engine). The single-transaction row is preallocated per thread and reused,
+    so callers must copy it before handing it to another thread.
+    """
+
+    def __init__(self, schema=TRANSACTION_SCHEMA):
+        self._steps = []
+        for field in schema:
+            index = FEATURE_COLUMNS.index(field.name) if field.name in FEATURE_COLUMNS else None
+            if field.kind == 'int':
+                parse, encode = _int_parser(FEATURE_DTYPES[field.name]), None
+            elif field.kind == 'money':
+                parse, encode = _parse_money, None
+            elif field.kind == 'type':
+                parse, encode = _parse_type, TYPE_MAP.__getitem__
+            elif field.kind == 'text':
+                parse, encode = _parse_text, None
+            else:
+                raise ValueError(f"Field {field.name!r}: unknown kind {field.kind!r}")
+            self._steps.append((field.name, field.default, parse, encode, index))
+        covered = {index for *_, index in self._steps if index is not None}
+        if len(covered) != len(FEATURE_COLUMNS):
+            missing = [col for i, col in enumerate(FEATURE_COLUMNS) if i not in covered]
+            raise ValueError(f"Schema does not cover model columns: {', '.join(missing)}")
+        self._local = threading.local()
+
+    def _row(self):
+        row = getattr(self._local, 'row', None)
+        if row is None:
+            row = self._local.row = np.zeros((1, len(FEATURE_COLUMNS)), dtype=np.float32)
+        return row
+
+    def _fill(self, data, row, prefix=''):
+        if not isinstance(data, dict):
+            raise PayloadError({prefix.rstrip('.') or 'body': 'must be a JSON object'})
+        fields = {}
+        errors = {}
+        for name, default, parse, encode, index in self._steps:
+            try:
+                value = parse(data.get(name, default))
+            except ValueError as e:
+                errors[prefix + name] = str(e)
+                continue
+            fields[name] = value
+            if index is not None:
+                row[index] = value if encode is None else encode(value)
+        if errors:
+            raise PayloadError(errors)
+        return fields
+
+    def parse(self, data):
+        """(1, n_features) float32 row and parsed fields for one transaction"""
+        row = self._row()
+        return row, self._fill(data, row[0])
+
+    def parse_batch(self, transactions):
+        """(n, n_features) float32 matrix for a list of transactions, with all field errors"""
+        X = np.empty((len(transactions), len(FEATURE_COLUMNS)), dtype=np.float32)
+        errors = {}
+        for i, data in enumerate(transactions):
+            try:
+                self._fill(data, X[i], prefix=f'transactions[{i}].')
+            except PayloadError as e:
+                errors.update(e.errors)
+        if errors:
+            raise PayloadError(errors)
+        return X
+
+
+def parse_top_k(value):
+    """Optional positive number of contributions to return per explanation"""
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise PayloadError({'top_k': 'must be a positive integer'})
+    return value
+
+
+def loads(body):
+    """Decode a JSON request body, as a PayloadError when it is not valid JSON"""
+    try:
+        return orjson.loads(body) if orjson is not None else json.loads(body)
+    except ValueError:
+        raise PayloadError({'body': 'must be valid JSON'}) from None
+
+
+def _default(obj):
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj):
+    """Encode a response body to JSON bytes (numpy values and datetimes included)"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, default=_default, separators=(',', ':')).encode()
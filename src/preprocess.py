@@ -1,14 +1,19 @@
+import argparse
 import os
+import numpy as np
 import pandas as pd
-from sklearn.preprocessing import LabelEncoder
 import logging
 from pathlib import Path
 import pickle
 
+from features import TARGET_COLUMN, TYPE_MAP, coerce_frame, encode_types, rename_raw_columns, validate_frame
+from partitions import STEP_WIDTH, PartitionWriter
+
 # Configure paths - UPDATED TO MATCH YOUR ACTUAL FILE NAME
 BASE_DIR = Path(__file__).parent.parent
 RAW_DATA = BASE_DIR / 'data/raw/onlinefraud.csv'  # Changed from transactions.csv
 PROCESSED_DATA = BASE_DIR / 'data/processed/cleaned_transactions.csv'
+PARTITIONS_DIR = BASE_DIR / 'data/processed/partitions'
 
 # Configure logging
 logging.basicConfig(
@@ -28,9 +33,11 @@ def validate_input_file(filepath):
         raise ValueError("Only CSV files are supported")
     return True
 
-def preprocess_data(input_file=RAW_DATA, output_file=PROCESSED_DATA):
+def preprocess_data(input_file=RAW_DATA, output_file=PROCESSED_DATA,
+                    partitions_dir=PARTITIONS_DIR, step_width=STEP_WIDTH):
     """
-    Preprocess transaction data with robust error handling
+    Preprocess transaction data with robust error handling.
+    Also writes step-range partitions plus a manifest for time-windowed training.
     """
     try:
         validate_input_file(input_file)
@@ -39,27 +46,31 @@ def preprocess_data(input_file=RAW_DATA, output_file=PROCESSED_DATA):
         output_file.parent.mkdir(parents=True, exist_ok=True)
         
         chunks = pd.read_csv(input_file, chunksize=100000)
-        processed_chunks = []
-        encoder = LabelEncoder()
-        label_dict = {}
+        partitions = PartitionWriter(partitions_dir, step_width)
         for i, chunk in enumerate(chunks, 1):
             chunk = chunk.drop(['nameOrig', 'nameDest', 'isFlaggedFraud'], 
                              axis=1, errors='ignore')
-            chunk['type'] = encoder.fit_transform(chunk['type'].astype(str))
-            # Save label mapping for 'type'
-            label_dict.update({str(cls): int(lbl) for cls, lbl in zip(encoder.classes_, encoder.transform(encoder.classes_))})
+            # onlinefraud.csv says newbalanceOrig; the feature schema says newbalanceOrg
+            rename_raw_columns(chunk)
+            # Fixed type codes from the feature schema, identical for every chunk
+            chunk['type'] = encode_types(chunk['type'])
             chunk.fillna(0, inplace=True)
-            processed_chunks.append(chunk)
+            # Compact schema dtypes, checked here so a schema mismatch fails before training
+            chunk = validate_frame(coerce_frame(chunk), require_target=True)
+            # The label stays 0/1 on disk
+            chunk[TARGET_COLUMN] = chunk[TARGET_COLUMN].astype(np.int8)
+            # Stream each chunk straight to disk instead of concatenating in memory
+            chunk.to_csv(output_file, mode='w' if i == 1 else 'a', header=(i == 1), index=False)
+            partitions.write(chunk)
             logger.info(f"Processed chunk {i}")
-        final_df = pd.concat(processed_chunks)
-        final_df.to_csv(output_file, index=False)
-        logger.info(f"Saved processed data to {output_file}")
+        partitions.close()
+        logger.info(f"Saved processed data to {output_file} and partitions to {partitions_dir}")
         print(f"✅ Successfully processed data. Output at: {output_file}")
         # Save label encoder mapping for use in app
         models_dir = BASE_DIR / 'models'
         models_dir.mkdir(exist_ok=True)
         with open(models_dir / 'labels.pkl', 'wb') as f:
-            pickle.dump(label_dict, f)
+            pickle.dump(dict(TYPE_MAP), f)
         return output_file
         
     except Exception as e:
@@ -68,5 +79,8 @@ def preprocess_data(input_file=RAW_DATA, output_file=PROCESSED_DATA):
         raise
 
 if __name__ == "__main__":
-    # Now using the configured paths automatically
-    preprocess_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Preprocess raw transactions for training")
+    parser.add_argument('--input', type=Path, default=RAW_DATA,
+                        help="Raw CSV in the onlinefraud.csv schema (e.g. data/raw/synthetic_transactions.csv)")
+    args = parser.parse_args()
+    preprocess_data(args.input)
\ No newline at end of file
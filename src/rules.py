@@ -0,0 +1,217 @@
+import ast
+import bisect
+from collections import namedtuple
+from string import Formatter
+import numpy as np
+
+from features import FEATURE_COLUMNS
+
+# Decision tiers used by the apps: LOW <= 0.3 < MEDIUM <= 0.7 < HIGH
+TIER_THRESHOLDS = (0.3, 0.7)
+TIER_NAMES = ('LOW', 'MEDIUM', 'HIGH')
+TIER_STYLES = {
+    'LOW': {'color': '#27ae60', 'recommendation': 'APPROVE TRANSACTION'},
+    'MEDIUM': {'color': '#f39c12', 'recommendation': 'ADDITIONAL VERIFICATION'},
+    'HIGH': {'color': '#e74c3c', 'recommendation': 'BLOCK TRANSACTION'},
+}
+
+# Columns a rule may reference; sender/recipient fall back to the raw CSV names
+RULE_COLUMNS = FEATURE_COLUMNS + ['sender', 'recipient']
+COLUMN_ALIASES = {'sender': 'nameOrig', 'recipient': 'nameDest'}
+
+# kind is 'risk_factor' (message shown when it fires) or 'validation' (check that should pass).
+# expr is a python expression over column names; and/or/not, chained comparisons
+# and `in` are compiled to element-wise numpy operations over the whole batch.
+Rule = namedtuple('Rule', ['name', 'kind', 'expr', 'message'])
+
+RULES = (
+    Rule('high_amount', 'risk_factor',
+         'amount > 10000', 'High transaction amount'),
+    Rule('exact_balance_drain', 'risk_factor',
+         'oldbalanceOrg == newbalanceOrg + amount', 'Perfect balance consistency'),
+    Rule('inactive_recipient', 'risk_factor',
+         'newbalanceDest == 0 and oldbalanceDest == 0', 'Recipient account shows no activity'),
+    Rule('high_risk_type', 'risk_factor',
+         "type in ('CASH_OUT', 'TRANSFER')", '{type} transactions have higher risk'),
+    Rule('balance_consistent', 'validation',
+         'oldbalanceOrg - newbalanceOrg == amount', None),
+    Rule('amount_reasonable', 'validation',
+         'amount > 0 and amount < 100000', None),
+    Rule('different_participants', 'validation',
+         'sender != recipient', None),
+)
+
+# Rules-only decision used when model scoring is shed: (minimum risk factors fired, tier)
+RULES_ONLY_TIERS = ((3, 'HIGH'), (2, 'MEDIUM'), (0, 'LOW'))
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Call, ast.Name, ast.Load,
+    ast.Constant, ast.Tuple, ast.List,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Mod, ast.USub, ast.Invert, ast.BitAnd, ast.BitOr,
+    ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+)
+# The scalar form keeps python's boolean syntax instead of rewriting it
+_SCALAR_NODES = _ALLOWED_NODES + (ast.BoolOp, ast.And, ast.Or, ast.Not, ast.In, ast.NotIn)
+
+
+def tier_of(probability):
+    """Tier name for a single fraud probability"""
+    return TIER_NAMES[bisect.bisect_left(TIER_THRESHOLDS, probability)]
+
+
+def rules_only_tier(n_risk_factors):
+    """Tier from the number of fired risk-factor rules, for degraded decisions"""
+    return next(tier for minimum, tier in RULES_ONLY_TIERS if n_risk_factors >= minimum)
+
+
+def tier_index(probabilities):
+    """Tier index (0=LOW, 1=MEDIUM, 2=HIGH) for an array of fraud probabilities"""
+    return np.searchsorted(TIER_THRESHOLDS, np.asarray(probabilities), side='left')
+
+
+class _Vectorize(ast.NodeTransformer):
+    """Rewrite scalar boolean syntax into numpy element-wise operators"""
+
+    @staticmethod
+    def _chain(op, values):
+        result = values[0]
+        for value in values[1:]:
+            result = ast.BinOp(left=result, op=op, right=value)
+        return result
+
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        op = ast.BitAnd() if isinstance(node.op, ast.And) else ast.BitOr()
+        return self._chain(op, node.values)
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return ast.UnaryOp(op=ast.Invert(), operand=node.operand)
+        return node
+
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        parts = []
+        left = node.left
+        for op, right in zip(node.ops, node.comparators):
+            if isinstance(op, (ast.In, ast.NotIn)):
+                part = ast.Call(func=ast.Name(id='isin', ctx=ast.Load()), args=[left, right], keywords=[])
+                if isinstance(op, ast.NotIn):
+                    part = ast.UnaryOp(op=ast.Invert(), operand=part)
+            else:
+                part = ast.Compare(left=left, ops=[op], comparators=[right])
+            parts.append(part)
+            left = right
+        return self._chain(ast.BitAnd(), parts)
+
+
+def compile_rule(rule, vectorize=True):
+    """Compile a rule expression into a code object plus the columns it reads.
+
+    With vectorize=False the expression is kept as written, for evaluating one
+    transaction of python scalars.
+    """
+    tree = ast.parse(rule.expr, mode='eval')
+    if vectorize:
+        tree = _Vectorize().visit(tree)
+    allowed = _ALLOWED_NODES if vectorize else _SCALAR_NODES
+    columns = []
+    for node in ast.walk(tree):
+        if not isinstance(node, allowed):
+            raise ValueError(f"Rule {rule.name!r}: unsupported syntax {type(node).__name__}")
+        if isinstance(node, ast.Call) and not (isinstance(node.func, ast.Name) and node.func.id == 'isin'):
+            raise ValueError(f"Rule {rule.name!r}: only isin() calls are allowed")
+        if isinstance(node, ast.Name) and node.id != 'isin':
+            if node.id not in RULE_COLUMNS:
+                raise ValueError(f"Rule {rule.name!r}: unknown column {node.id!r}")
+            columns.append(node.id)
+    code = compile(ast.fix_missing_locations(tree), f'<rule {rule.name}>', 'eval')
+    return code, list(dict.fromkeys(columns))
+
+
+class RuleEngine:
+    """Evaluate declared risk/validation rules over a batch of transactions.
+
+    A batch is anything indexable by column name (DataFrame, dict of arrays);
+    every rule is evaluated once over the full batch. ``assess_one`` uses a
+    scalar compilation of the same rules, skipping the array setup per request.
+    """
+
+    def __init__(self, rules=RULES):
+        self.rules = tuple(rules)
+        self._compiled = [compile_rule(rule) for rule in self.rules]
+        self._scalar = [compile_rule(rule, vectorize=False) for rule in self.rules]
+        self._message_fields = [
+            [field for _, field, _, _ in Formatter().parse(rule.message or '') if field]
+            for rule in self.rules
+        ]
+        self.risk_factor_rules = [r.name for r in self.rules if r.kind == 'risk_factor']
+        self.validation_rules = [r.name for r in self.rules if r.kind == 'validation']
+
+    @staticmethod
+    def _column(batch, name):
+        if name not in batch and COLUMN_ALIASES.get(name) in batch:
+            name = COLUMN_ALIASES[name]
+        return np.asarray(batch[name])
+
+    def _has(self, batch, name):
+        return name in batch or COLUMN_ALIASES.get(name) in batch
+
+    def evaluate(self, batch, n_rows=None):
+        """Return {rule name: bool array}; rules whose inputs are absent are skipped"""
+        if n_rows is None:
+            n_rows = len(batch[next(iter(batch.keys()))]) if hasattr(batch, 'keys') else len(batch)
+        namespace = {'__builtins__': {}, 'isin': np.isin}
+        results = {}
+        for rule, (code, columns) in zip(self.rules, self._compiled):
+            if not all(self._has(batch, col) for col in columns):
+                continue
+            values = {col: self._column(batch, col) for col in columns}
+            results[rule.name] = np.broadcast_to(np.asarray(eval(code, namespace, values), dtype=bool), (n_rows,))
+        return results
+
+    def risk_factors(self, batch, results):
+        """Per-row list of messages for the risk-factor rules that fired"""
+        n_rows = len(next(iter(results.values()))) if results else 0
+        factors = [[] for _ in range(n_rows)]
+        for rule, fields in zip(self.rules, self._message_fields):
+            if rule.kind != 'risk_factor' or rule.name not in results:
+                continue
+            fired = np.flatnonzero(results[rule.name])
+            if not fields:
+                for i in fired:
+                    factors[i].append(rule.message)
+                continue
+            values = {field: self._column(batch, field) for field in fields}
+            for i in fired:
+                factors[i].append(rule.message.format(**{f: v[i] for f, v in values.items()}))
+        return factors
+
+    def assess(self, batch):
+        """Risk factors and validation results for every row of the batch"""
+        results = self.evaluate(batch)
+        return {
+            'risk_factors': self.risk_factors(batch, results),
+            'validation': {name: results[name] for name in self.validation_rules if name in results},
+            'results': results,
+        }
+
+    def assess_one(self, transaction):
+        """Risk factors and validation results for a single transaction given as a dict of scalars"""
+        namespace = {'__builtins__': {}, 'isin': np.isin}
+        values = dict(transaction)
+        for name, alias in COLUMN_ALIASES.items():
+            if name not in values and alias in values:
+                values[name] = values[alias]
+        risk_factors = []
+        validation = {}
+        for rule, (code, columns), fields in zip(self.rules, self._scalar, self._message_fields):
+            if not all(col in values for col in columns):
+                continue
+            fired = bool(eval(code, namespace, values))
+            if rule.kind == 'validation':
+                validation[rule.name] = fired
+            elif fired:
+                risk_factors.append(rule.message.format(**{f: values[f] for f in fields}) if fields else rule.message)
+        return {'risk_factors': risk_factors, 'validation': validation}
@@ -0,0 +1,154 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+import numpy as np
+
+from rules import TIER_NAMES, tier_index
+
+logger = logging.getLogger(__name__)
+
+# Requests allowed to wait for the shadow worker before new ones are dropped
+SHADOW_MAX_PENDING = 256
+# Queued rows scored together in one predict_proba call
+SHADOW_MAX_BATCH = 256
+# How long the worker backs off while the primary model is busy
+SHADOW_IDLE_POLL_SECONDS = 0.005
+# Histogram of candidate - primary probability
+DELTA_EDGES = np.linspace(-1.0, 1.0, 41)
+
+
+class ShadowScorer:
+    """Score a candidate model next to production without touching the response path.
+
+    ``submit`` never blocks: rows are queued for one background thread and
+    dropped (and counted) once ``max_pending`` requests are waiting. The thread
+    only works while ``busy()`` is false, i.e. between production requests, and
+    scores everything queued in a single ``predict_proba`` call. Results are
+    folded into fixed-size aggregates exposed by ``snapshot``.
+    """
+
+    def __init__(self, model, name='candidate', max_pending=SHADOW_MAX_PENDING,
+                 max_batch=SHADOW_MAX_BATCH, busy=None):
+        self.model = model
+        self.name = name
+        self.max_pending = max_pending
+        self.max_batch = max_batch
+        self.busy = busy or (lambda: False)
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._closed = False
+        self._worker = None
+        self._worker_pid = None
+        self.submitted = 0
+        self.dropped = 0
+        self.errors = 0
+        self.scored = 0
+        self.batches = 0
+        self._delta_sum = 0.0
+        self._abs_delta_sum = 0.0
+        self._max_abs_delta = 0.0
+        self._delta_hist = np.zeros(len(DELTA_EDGES) - 1, dtype=np.int64)
+        # Rows: primary tier, columns: candidate tier
+        self._tiers = np.zeros((len(TIER_NAMES), len(TIER_NAMES)), dtype=np.int64)
+
+    def submit(self, X, primary_probabilities):
+        """Queue rows already scored by the primary model; returns False if dropped"""
+        item = (
+            np.array(X, dtype=np.float32, copy=True).reshape(len(X), -1),
+            np.atleast_1d(np.asarray(primary_probabilities, dtype=np.float64)),
+        )
+        with self._lock:
+            if self._closed or len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                return False
+            # Started lazily, so every forked worker runs its own thread
+            if self._worker_pid != os.getpid():
+                self._worker_pid = os.getpid()
+                self._worker = threading.Thread(target=self._run, name='shadow', daemon=True)
+                self._worker.start()
+            self._pending.append(item)
+            self.submitted += 1
+            self._ready.notify()
+        return True
+
+    def _next_batch(self):
+        """Wait for queued work and for the primary model to go idle; [] once closed and drained"""
+        with self._ready:
+            while not self._pending and not self._closed:
+                self._ready.wait()
+        while self.busy() and not self._closed:
+            time.sleep(SHADOW_IDLE_POLL_SECONDS)
+        with self._lock:
+            return [self._pending.popleft() for _ in range(min(len(self._pending), self.max_batch))]
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+            X = np.concatenate([rows for rows, _ in batch])
+            primary = np.concatenate([probabilities for _, probabilities in batch])
+            self._score(X, primary, len(batch))
+
+    def _score(self, X, primary, requests):
+        try:
+            candidate = self.model.predict_proba(X)[:, 1]
+        except Exception as e:
+            logger.warning(f"Shadow model {self.name} failed: {e}")
+            with self._lock:
+                self.errors += requests
+        else:
+            self._record(primary, candidate)
+
+    def _record(self, primary, candidate):
+        delta = candidate - primary
+        hist = np.histogram(np.clip(delta, -1.0, 1.0), bins=DELTA_EDGES)[0]
+        pairs = tier_index(primary) * len(TIER_NAMES) + tier_index(candidate)
+        tiers = np.bincount(pairs, minlength=self._tiers.size).reshape(self._tiers.shape)
+        with self._lock:
+            self.scored += len(delta)
+            self.batches += 1
+            self._delta_sum += float(delta.sum())
+            self._abs_delta_sum += float(np.abs(delta).sum())
+            self._max_abs_delta = max(self._max_abs_delta, float(np.abs(delta).max()))
+            self._delta_hist += hist
+            self._tiers += tiers
+
+    def snapshot(self):
+        """Current aggregates as a JSON-friendly dict"""
+        with self._lock:
+            scored = self.scored
+            agreements = int(np.trace(self._tiers))
+            return {
+                'model': self.name,
+                'submitted': self.submitted,
+                'pending': len(self._pending),
+                'scored': scored,
+                'batches': self.batches,
+                'dropped': self.dropped,
+                'errors': self.errors,
+                'mean_delta': self._delta_sum / scored if scored else None,
+                'mean_abs_delta': self._abs_delta_sum / scored if scored else None,
+                'max_abs_delta': self._max_abs_delta,
+                'tier_agreement': agreements / scored if scored else None,
+                'tier_disagreements': scored - agreements,
+                'tier_matrix': {
+                    primary: dict(zip(TIER_NAMES, self._tiers[i].tolist()))
+                    for i, primary in enumerate(TIER_NAMES)
+                },
+                'delta_histogram': {
+                    'edges': DELTA_EDGES.tolist(),
+                    'counts': self._delta_hist.tolist(),
+                },
+            }
+
+    def shutdown(self, wait=False):
+        """Stop accepting rows; with wait, score what is queued and join the worker"""
+        with self._ready:
+            self._closed = True
+            self._ready.notify_all()
+        if wait and self._worker is not None and self._worker_pid == os.getpid():
+            self._worker.join()
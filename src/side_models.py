@@ -0,0 +1,107 @@
+import logging
+import numpy as np
+from sklearn.decomposition import IncrementalPCA
+from sklearn.cluster import MiniBatchKMeans
+import joblib
+
+from features import FEATURE_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# Each side model compresses one group of money columns and clusters the result
+SIDE_MODEL_GROUPS = {
+    'origin': ['amount', 'oldbalanceOrg', 'newbalanceOrg'],
+    'destination': ['amount', 'oldbalanceDest', 'newbalanceDest'],
+    'balances': ['amount', 'oldbalanceOrg', 'newbalanceOrg', 'oldbalanceDest', 'newbalanceDest'],
+}
+N_COMPONENTS = 3
+N_CLUSTERS = 2
+SIDE_MODELS_FILE = 'side_models.pkl'
+
+
+class SideModelBundle:
+    """PCA + KMeans pairs per feature group, fit incrementally over data chunks"""
+
+    def __init__(self, groups=SIDE_MODEL_GROUPS, n_components=N_COMPONENTS,
+                 n_clusters=N_CLUSTERS, random_state=42):
+        self.groups = {name: list(cols) for name, cols in groups.items()}
+        self.pca = {
+            name: IncrementalPCA(n_components=min(n_components, len(cols)))
+            for name, cols in self.groups.items()
+        }
+        self.kmeans = {
+            name: MiniBatchKMeans(n_clusters=n_clusters, random_state=random_state, n_init=3)
+            for name in self.groups
+        }
+        self.n_rows_ = 0
+
+    @property
+    def input_columns(self):
+        """Union of the columns any side model reads, in first-seen order"""
+        return list(dict.fromkeys(col for cols in self.groups.values() for col in cols))
+
+    @property
+    def output_columns(self):
+        return [f'cluster_{name}' for name in self.groups]
+
+    def _inputs(self, X, name):
+        # Signed log keeps heavy-tailed amounts/balances on a comparable scale
+        values = np.asarray(X[self.groups[name]], dtype=np.float64)
+        return np.sign(values) * np.log1p(np.abs(values))
+
+    def fit(self, make_chunks):
+        """Fit from ``make_chunks()``, a callable returning a fresh iterable of DataFrames.
+
+        Two passes are made: the first fits the PCAs, the second fits the
+        clusterings on the projected chunks. Only one chunk is held at a time.
+        """
+        for chunk in make_chunks():
+            if len(chunk) < max(p.n_components for p in self.pca.values()):
+                continue
+            for name, pca in self.pca.items():
+                pca.partial_fit(self._inputs(chunk, name))
+            self.n_rows_ += len(chunk)
+        if not self.n_rows_:
+            raise ValueError("No training rows available for side models")
+        logger.info(f"Side model PCAs fit on {self.n_rows_} rows")
+
+        for chunk in make_chunks():
+            if len(chunk) < max(km.n_clusters for km in self.kmeans.values()):
+                continue
+            for name, km in self.kmeans.items():
+                km.partial_fit(self.pca[name].transform(self._inputs(chunk, name)))
+        logger.info("Side model clusterings fit")
+        return self
+
+    def check_columns(self, columns):
+        """Raise before any fitting starts if the training data lacks a side-model input"""
+        missing = [col for col in self.input_columns if col not in columns]
+        if missing:
+            raise ValueError(f"Side models need columns missing from the training data: {', '.join(missing)}")
+
+    def assign_one(self, row):
+        """Cluster per group for one feature row (FEATURE_COLUMNS order), in plain numpy.
+
+        Same result as the fitted PCA + KMeans ``predict``, without building a
+        DataFrame or going through the estimators' input validation.
+        """
+        row = np.asarray(row, dtype=np.float64).ravel()
+        clusters = {}
+        for name, cols in self.groups.items():
+            values = row[[FEATURE_COLUMNS.index(col) for col in cols]]
+            projected = (np.sign(values) * np.log1p(np.abs(values)) - self.pca[name].mean_) @ self.pca[name].components_.T
+            centers = self.kmeans[name].cluster_centers_
+            clusters[f'cluster_{name}'] = int(np.argmin(((centers - projected) ** 2).sum(axis=1)))
+        return clusters
+
+    def save(self, path):
+        joblib.dump(self, path, compress=3)
+        return path
+
+
+def load_side_models(path):
+    """Load the side-model bundle, or None when it has not been trained"""
+    try:
+        return joblib.load(path)
+    except FileNotFoundError:
+        return None
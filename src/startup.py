@@ -0,0 +1,207 @@
+"""
+Startup-time report for the apps: per-module import cost from ``python -X importtime``
+plus the artifact load phases recorded by a StartupState, checked against a budget.
+
+    python src/startup.py web_app --budget-ms 800 --ready-budget-ms 5000
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+IMPORT_BUDGET_MS = 1000
+READY_TIMEOUT_SECONDS = 120
+REPORT_TOP = 15
+
+# Written to stderr once the import returns; later importtime lines come from background loading
+IMPORTED_MARKER = '--- startup: module imported ---'
+
+ImportTiming = namedtuple('ImportTiming', ['module', 'self_us', 'cumulative_us', 'depth'])
+
+
+class StartupState:
+    """Readiness of an app whose artifacts load in the background, with per-phase timings"""
+
+    def __init__(self):
+        self.status = 'loading'
+        self.error = None
+        self.phases = {}
+        self._started = time.monotonic()
+        self._ready_after = None
+        self._done = threading.Event()
+
+    @contextmanager
+    def timed(self, phase):
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.phases[phase] = (time.monotonic() - started) * 1000
+
+    def finish(self, error=None):
+        """Mark loading done, as ready or failed with an error message"""
+        self.status = 'failed' if error else 'ready'
+        self.error = error
+        self._ready_after = (time.monotonic() - self._started) * 1000
+        self._done.set()
+
+    @property
+    def ready(self):
+        return self.status == 'ready'
+
+    def wait(self, timeout=None):
+        """Block until loading finished (or timeout seconds passed); True when ready"""
+        self._done.wait(timeout)
+        return self.ready
+
+    def snapshot(self):
+        return {
+            'status': self.status,
+            'error': self.error,
+            'ready_after_ms': self._ready_after,
+            'phases_ms': dict(self.phases),
+        }
+
+
+# Runs in the child interpreter: import the module, then wait for its StartupState
+_PROBE = """
+import json, sys, time
+from startup import StartupState
+started = time.perf_counter()
+module = __import__({module!r})
+imported_ms = (time.perf_counter() - started) * 1000
+sys.stderr.write({marker!r} + '\\n')
+sys.stderr.flush()
+states = [v for v in vars(module).values() if isinstance(v, StartupState)]
+if states and {wait!r}:
+    states[0].wait({timeout!r})
+print(json.dumps({{'import_ms': imported_ms, 'startup': states[0].snapshot() if states else None}}))
+"""
+
+
+def parse_importtime(stderr):
+    """ImportTiming per line of ``-X importtime`` output, in the order Python printed them"""
+    timings = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # Column header
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        timings.append(ImportTiming(name.strip(), int(fields[0]), int(fields[1]), depth))
+    return timings
+
+
+def measure_startup(module, wait=True, timeout=READY_TIMEOUT_SECONDS, python=sys.executable):
+    """Import module in a fresh interpreter and report import timings and load phases"""
+    env = dict(os.environ)
+    paths = [str(BASE_DIR), str(BASE_DIR / 'src')]
+    env['PYTHONPATH'] = os.pathsep.join(paths + ([env['PYTHONPATH']] if env.get('PYTHONPATH') else []))
+    code = _PROBE.format(module=module, wait=wait, timeout=timeout, marker=IMPORTED_MARKER)
+    result = subprocess.run(
+        [python, '-X', 'importtime', '-c', code],
+        cwd=BASE_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    imported, _, background = result.stderr.partition(IMPORTED_MARKER)
+    timings = parse_importtime(imported)
+    background_timings = parse_importtime(background)
+    return {
+        'module': module,
+        'import_ms': probe['import_ms'],
+        'startup': probe['startup'],
+        'packages_ms': package_totals(timings),
+        'background_packages_ms': package_totals(background_timings),
+        'imports': timings,
+        'background_imports': background_timings,
+    }
+
+
+def package_totals(timings):
+    """Self import time summed per top-level package, most expensive first (ms)"""
+    totals = {}
+    for timing in timings:
+        package = timing.module.split('.')[0]
+        totals[package] = totals.get(package, 0) + timing.self_us / 1000
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def check_budget(report, budget_ms=IMPORT_BUDGET_MS, ready_budget_ms=None):
+    """List of budget violations; empty when the module starts within budget"""
+    violations = []
+    if report['import_ms'] > budget_ms:
+        violations.append(f"import took {report['import_ms']:.0f} ms (budget {budget_ms} ms)")
+    startup = report['startup']
+    if ready_budget_ms is not None and startup is not None:
+        if startup['status'] != 'ready':
+            violations.append(f"not ready: {startup['status']} {startup['error'] or ''}".rstrip())
+        elif startup['ready_after_ms'] > ready_budget_ms:
+            violations.append(f"ready after {startup['ready_after_ms']:.0f} ms (budget {ready_budget_ms} ms)")
+    return violations
+
+
+def format_report(report, top=REPORT_TOP):
+    lines = [f"{report['module']}: import {report['import_ms']:.0f} ms"]
+    lines.append("  Import time by package (self, ms):")
+    for package, ms in list(report['packages_ms'].items())[:top]:
+        lines.append(f"    {package:<30} {ms:>9.1f}")
+    startup = report['startup']
+    if report['background_packages_ms']:
+        lines.append("  Imported while loading artifacts (self, ms):")
+        for package, ms in list(report['background_packages_ms'].items())[:top]:
+            lines.append(f"    {package:<30} {ms:>9.1f}")
+    if startup is not None:
+        ready = startup['ready_after_ms']
+        lines.append(f"  Artifacts: {startup['status']}" + (f" after {ready:.0f} ms" if ready is not None else ''))
+        for phase, ms in startup['phases_ms'].items():
+            lines.append(f"    {phase:<30} {ms:>9.1f}")
+        if startup['error']:
+            lines.append(f"    error: {startup['error']}")
+    return '\n'.join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report app startup time and enforce a budget")
+    parser.add_argument('modules', nargs='*', default=['web_app'],
+                        help="Modules to import (web_app, app)")
+    parser.add_argument('--budget-ms', type=float, default=IMPORT_BUDGET_MS,
+                        help="Maximum import time per module")
+    parser.add_argument('--ready-budget-ms', type=float,
+                        help="Maximum time until background artifact loading is ready")
+    parser.add_argument('--top', type=int, default=REPORT_TOP,
+                        help="Number of packages to list")
+    parser.add_argument('--json', action='store_true', help="Print the reports as JSON")
+    args = parser.parse_args()
+
+    failed = False
+    reports = []
+    for module in args.modules:
+        report = measure_startup(module)
+        violations = check_budget(report, args.budget_ms, args.ready_budget_ms)
+        failed = failed or bool(violations)
+        if args.json:
+            reports.append({
+                **report,
+                'imports': [t._asdict() for t in report['imports']],
+                'background_imports': [t._asdict() for t in report['background_imports']],
+                'violations': violations,
+            })
+            continue
+        print(format_report(report, args.top))
+        for violation in violations:
+            print(f"  OVER BUDGET: {violation}")
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    sys.exit(1 if failed else 0)
@@ -1,20 +1,42 @@
+import argparse
 import os
 os.environ['KMP_DUPLICATE_LIB_OK']='True'  # Prevents OpenMP conflicts
 os.environ['OMP_NUM_THREADS']='1'  # Prevents XGBoost threading issues
-import pandas as pd
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from sklearn.model_selection import train_test_split
 from xgboost import XGBClassifier
-from sklearn.metrics import classification_report, roc_auc_score, confusion_matrix
 import joblib
+import json
 import logging
 from pathlib import Path
 from datetime import datetime
 import pickle
 
+from checkpoint import CHECKPOINT_EVERY, BoosterCheckpoint, TrainingRun, fingerprint_inputs, prune_runs
+from drift import DRIFT_FILE, build_reference
+from evaluate import evaluate_model
+from explain import IMPORTANCE_FILE, compute_global_importance, save_global_importance
+from features import TARGET_COLUMN, read_processed_csv, validate_frame
+from partitions import iter_window_chunks, load_manifest, read_window, select_partitions, sliding_windows
+from side_models import SIDE_MODELS_FILE, SideModelBundle
+
 # Configure paths
 BASE_DIR = Path(__file__).parent.parent
 PROCESSED_DATA = BASE_DIR / 'data/processed/cleaned_transactions.csv'
+PARTITIONS_DIR = BASE_DIR / 'data/processed/partitions'
 MODELS_DIR = BASE_DIR / 'models'
+SIDE_MODEL_CHUNK_SIZE = 200000
+TEST_SIZE = 0.3
+SPLIT_SEED = 42
+MODEL_PARAMS = dict(
+    n_estimators=100,  # Reduced for faster training
+    max_depth=5,
+    learning_rate=0.05,
+    tree_method='hist',  # Essential for Streamlit Cloud
+    n_jobs=1,  # Critical for stability
+    eval_metric='aucpr'  # Better for imbalanced data
+)
 
 # Configure logging
 logging.basicConfig(
@@ -32,77 +54,178 @@ def load_data(filepath=PROCESSED_DATA):
                                   f"\n1. preprocess.py ran successfully"
                                   f"\n2. File exists at {filepath}")
         
-        df = pd.read_csv(filepath)
+        # Compact schema dtypes roughly halve the in-memory footprint
+        df = read_processed_csv(filepath)
         
         # Enhanced validation
         if 'isFraud' not in df.columns:
             raise ValueError("Target column 'isFraud' missing in data")
+        validate_frame(df, require_target=True)
         if len(df) < 1000:
             logger.warning(f"Low training samples: {len(df)}")
             
-        logger.info(f"Successfully loaded {len(df)} records from {filepath}")
+        logger.info(f"Successfully loaded {len(df)} records from {filepath} "
+                    f"({df.memory_usage(deep=True).sum() / 1e6:.1f} MB)")
         return df
         
     except Exception as e:
         logger.error(f"Data loading failed: {str(e)}")
         raise
 
-def evaluate_model(model, X_test, y_test):
-    """Generate comprehensive evaluation metrics"""
-    y_pred = model.predict(X_test)
-    y_proba = model.predict_proba(X_test)[:, 1]
-    
-    logger.info("\nClassification Report:\n" + classification_report(y_test, y_pred))
-    logger.info("\nConfusion Matrix:\n" + str(confusion_matrix(y_test, y_pred)))
-    logger.info(f"\nAUC-ROC: {roc_auc_score(y_test, y_proba):.4f}")
+def iter_training_chunks(row_mask, columns, filepath=PROCESSED_DATA, chunksize=SIDE_MODEL_CHUNK_SIZE):
+    """Stream the processed data from disk, keeping only rows selected by row_mask"""
+    for chunk in read_processed_csv(filepath, usecols=columns, chunksize=chunksize):
+        yield chunk[row_mask[chunk.index]]
+
+def build_model(y_train):
+    """Model configuration with improved defaults"""
+    return XGBClassifier(
+        scale_pos_weight=len(y_train[y_train==0])/max(1, len(y_train[y_train==1])),
+        **MODEL_PARAMS
+    )
+
+def time_split(df, test_fraction=0.3):
+    """Out-of-time split: the latest steps holding ~test_fraction of rows become the test set"""
+    cutoff = int(df['step'].quantile(1 - test_fraction))
+    is_test = df['step'] > cutoff
+    if not is_test.any() or is_test.all():
+        raise ValueError("Window spans too few steps for an out-of-time split")
+    return df[~is_test], df[is_test], cutoff
+
+def split_xy(df):
+    return df.drop(TARGET_COLUMN, axis=1), df[TARGET_COLUMN]
+
+def load_window_split(train_window, test_window=None, partitions_dir=PARTITIONS_DIR):
+    """Read only the partitions covering the windows and split out-of-time.
     
-    return {
-        'classification_report': classification_report(y_test, y_pred, output_dict=True),
-        'auc_roc': roc_auc_score(y_test, y_proba)
+    Returns train/test frames and the step range actually used for training.
+    """
+    if test_window is not None and test_window[0] <= train_window[1]:
+        raise ValueError(f"Test window {test_window} must start after train window {train_window}")
+    train_df = validate_frame(read_window(partitions_dir, *train_window), require_target=True)
+    if test_window is None:
+        train_df, test_df, cutoff = time_split(train_df)
+        train_window = (train_window[0], cutoff)
+    else:
+        test_df = validate_frame(read_window(partitions_dir, *test_window), require_target=True)
+    logger.info(f"Train steps {train_window}: {len(train_df)} rows, test: {len(test_df)} rows")
+    return train_df, test_df, train_window
+
+def training_fingerprint(train_window=None, test_window=None, partitions_dir=PARTITIONS_DIR):
+    """Fingerprint of everything a training run depends on: data files, windows and parameters"""
+    if train_window is None:
+        paths = [PROCESSED_DATA]
+    else:
+        manifest = load_manifest(partitions_dir)
+        windows = [train_window] + ([test_window] if test_window is not None else [])
+        names = sorted({p['path'] for window in windows for p in select_partitions(manifest, *window)})
+        paths = [Path(partitions_dir) / name for name in names]
+    config = {
+        'train_window': train_window,
+        'test_window': test_window,
+        'test_size': TEST_SIZE,
+        'split_seed': SPLIT_SEED,
+        'model': MODEL_PARAMS,
     }
+    return fingerprint_inputs(paths, config)
+
+def fit_with_checkpoints(model, run, X_train, y_train, X_test, y_test, checkpoint_every=CHECKPOINT_EVERY):
+    """Boost the remaining rounds, resuming from the run's last checkpoint if there is one"""
+    total_rounds = model.n_estimators
+    done = min(run.rounds, total_rounds)
+    if done == total_rounds:
+        logger.info(f"All {total_rounds} rounds restored from checkpoint {run.fingerprint}")
+        model.load_model(str(run.booster_path))
+        return model
+    if done:
+        logger.info(f"Resuming from checkpoint {run.fingerprint} at round {done}/{total_rounds}")
+    model.set_params(n_estimators=total_rounds - done, callbacks=[BoosterCheckpoint(run, checkpoint_every)])
+    model.fit(
+        X_train, y_train,
+        eval_set=[(X_test, y_test)],
+        xgb_model=str(run.booster_path) if done else None,
+        verbose=10  # More frequent progress updates
+    )
+    # The callback only lives for this fit; keep it out of the pickled model
+    model.set_params(n_estimators=total_rounds, callbacks=None)
+    run.save_booster(model, total_rounds, status='boosted')
+    return model
 
-def train_model():
-    """Main training pipeline with enhanced logging"""
+def train_model(train_window=None, test_window=None, checkpoint_every=CHECKPOINT_EVERY, force=False):
+    """Main training pipeline with enhanced logging.
+    
+    Without windows the full processed file is split at random (legacy behaviour).
+    With train_window=(first_step, last_step) only the matching step partitions are
+    read and the holdout is out-of-time: test_window, or the latest 30% of the window.
+    
+    The booster is checkpointed every checkpoint_every rounds under
+    models/checkpoints/<fingerprint>/, so a failed run resumes where it stopped.
+    A run whose inputs match a completed run is skipped unless force is set.
+    """
     try:
         # Ensure directories exist
         MODELS_DIR.mkdir(parents=True, exist_ok=True)
         (BASE_DIR / 'logs').mkdir(exist_ok=True)
+        side_models = SideModelBundle()
         
-        # Load and validate data
-        df = load_data()
-        X = df.drop('isFraud', axis=1)
-        y = df['isFraud']
-        
-        # Train-test split
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, 
-            test_size=0.3, 
-            random_state=42, 
-            stratify=y
-        )
+        run = TrainingRun(MODELS_DIR, training_fingerprint(train_window, test_window))
+        if run.completed_artifact and not force:
+            # The shared files may belong to another run since; serve this run's again
+            restored = run.restore()
+            logger.info(f"Inputs unchanged (fingerprint {run.fingerprint}), keeping "
+                        f"{run.completed_artifact} and restoring {', '.join(map(str, restored))}")
+            return run.completed_artifact
+        if force:
+            run.reset()
         
-        # Model configuration with improved defaults
-        model = XGBClassifier(
-            scale_pos_weight=len(y_train[y_train==0])/max(1, len(y_train[y_train==1])),
-            n_estimators=100,  # Reduced for faster training
-            max_depth=5,
-            learning_rate=0.05,
-            tree_method='hist',  # Essential for Streamlit Cloud
-            n_jobs=1,  # Critical for stability
-            eval_metric='aucpr'  # Better for imbalanced data
-        )
+        if train_window is None:
+            # Load and validate data
+            df = load_data()
+            X, y = split_xy(df)
+            
+            # Train-test split, reused as-is when resuming
+            split = run.load_split()
+            if split is None:
+                train_index, test_index = train_test_split(
+                    np.arange(len(df)),
+                    test_size=TEST_SIZE,
+                    random_state=SPLIT_SEED,
+                    stratify=y
+                )
+                run.save_split(train_index=train_index, test_index=test_index)
+            else:
+                train_index, test_index = split['train_index'], split['test_index']
+            X_train, X_test = X.iloc[train_index], X.iloc[test_index]
+            y_train, y_test = y.iloc[train_index], y.iloc[test_index]
+            train_mask = np.zeros(len(df), dtype=bool)
+            train_mask[train_index] = True
+            side_chunks = lambda: iter_training_chunks(train_mask, side_models.input_columns)
+        else:
+            train_df, test_df, train_steps = load_window_split(train_window, test_window)
+            X_train, y_train = split_xy(train_df)
+            X_test, y_test = split_xy(test_df)
+            del train_df, test_df
+            side_chunks = lambda: iter_window_chunks(PARTITIONS_DIR, *train_steps, columns=side_models.input_columns)
+        
+        model = build_model(y_train)
+        
+        # Side models stream training rows from disk and fit alongside the booster;
+        # their inputs are checked first so a bad file fails before any boosting
+        side_models.check_columns(X_train.columns)
+        side_pool = ThreadPoolExecutor(max_workers=1)
+        side_future = side_pool.submit(side_models.fit, side_chunks)
+        side_pool.shutdown(wait=False)
         
         # Training with progress logging
         logger.info(f"Training on {len(X_train)} samples...")
-        model.fit(
-            X_train, y_train,
-            eval_set=[(X_test, y_test)],
-            verbose=10  # More frequent progress updates
-        )
+        model = fit_with_checkpoints(model, run, X_train, y_train, X_test, y_test, checkpoint_every)
         
         # Evaluation
         metrics = evaluate_model(model, X_test, y_test)
         
+        # Wait for the side models before writing anything, so a failed fit leaves the served artifacts alone
+        side_models = side_future.result()
+        
         # Save artifacts
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         model_path = MODELS_DIR / f'fraud_model_{timestamp}.pkl'
@@ -113,47 +236,40 @@ def train_model():
         
         # Save metrics
         metrics_path = MODELS_DIR / f'model_metrics_{timestamp}.json'
-        pd.DataFrame(metrics['classification_report']).to_json(metrics_path)
+        with open(metrics_path, 'w') as f:
+            json.dump(metrics, f, indent=2)
+        
+        # Global importances are precomputed once so the apps never recompute them
+        importance_path = save_global_importance(
+            compute_global_importance(model, X_train),
+            MODELS_DIR / IMPORTANCE_FILE
+        )
+        
+        # Training-time feature/score distribution for production drift monitoring
+        drift_path = build_reference(model, X_train).save(MODELS_DIR / DRIFT_FILE)
         
         # Save model.pkl for app compatibility
-        with open(MODELS_DIR / 'model.pkl', 'wb') as f:
+        app_model_path = MODELS_DIR / 'model.pkl'
+        with open(app_model_path, 'wb') as f:
             pickle.dump(model, f)
         
-        # Dummy PCA/KMeans files for app (replace with real ones if available)
-        import numpy as np
-        from sklearn.decomposition import PCA
-        from sklearn.cluster import KMeans
-        
-        # C features
-        pca_c = PCA(n_components=3).fit(X_train.iloc[:, :6])
-        km_c = KMeans(n_clusters=2, random_state=42).fit(pca_c.transform(X_train.iloc[:, :6]))
-        with open(MODELS_DIR / 'PCA_C_features.pkl', 'wb') as f:
-            pickle.dump(pca_c, f)
-        with open(MODELS_DIR / 'km_C_features.pkl', 'wb') as f:
-            pickle.dump(km_c, f)
-        
-        # D features
-        pca_d = PCA(n_components=3).fit(X_train.iloc[:, :5])
-        km_d = KMeans(n_clusters=2, random_state=42).fit(pca_d.transform(X_train.iloc[:, :5]))
-        with open(MODELS_DIR / 'PCA_D_features.pkl', 'wb') as f:
-            pickle.dump(pca_d, f)
-        with open(MODELS_DIR / 'km_D_features.pkl', 'wb') as f:
-            pickle.dump(km_d, f)
-        
-        # V features
-        pca_v = PCA(n_components=3).fit(X_train.iloc[:, :11])
-        km_v = KMeans(n_clusters=2, random_state=42).fit(pca_v.transform(X_train.iloc[:, :11]))
-        with open(MODELS_DIR / 'PCA_V_features.pkl', 'wb') as f:
-            pickle.dump(pca_v, f)
-        with open(MODELS_DIR / 'km_V_features.pkl', 'wb') as f:
-            pickle.dump(km_v, f)
+        # PCA/KMeans side models, bundled into a single artifact
+        side_models_path = side_models.save(MODELS_DIR / SIDE_MODELS_FILE)
+        run.mark_complete(model_path, published=[
+            static_path, app_model_path, side_models_path, importance_path, drift_path
+        ])
+        prune_runs(MODELS_DIR, current=run.fingerprint)
         
         logger.info(f"""
         Training complete!
         - Model saved to: {model_path}
         - Static copy: {static_path}
         - Metrics: {metrics_path}
-        - AUC-ROC: {metrics['auc_roc']:.4f}
+        - Side models: {side_models_path}
+        - Feature importance: {importance_path}
+        - Drift reference: {drift_path}
+        - AUC-ROC: {metrics['auc_roc']}
+        - AUC-PR: {metrics['auc_pr']}
         """)
         
         return model_path
@@ -162,5 +278,62 @@ def train_model():
         logger.error(f"Training pipeline failed: {str(e)}", exc_info=True)
         raise
 
+def backtest(train_steps, test_steps, stride=None, first_step=None, last_step=None,
+             partitions_dir=PARTITIONS_DIR):
+    """Train and evaluate over sliding out-of-time windows.
+    
+    Each window reads only its own partitions, so cost scales with the window size
+    rather than the dataset size. Results go to models/backtest_<ts>.json.
+    """
+    manifest = load_manifest(partitions_dir)
+    first_step = first_step or manifest['partitions'][0]['step_min']
+    last_step = last_step or manifest['partitions'][-1]['step_max']
+    results = []
+    for train_window, test_window in sliding_windows(first_step, last_step, train_steps, test_steps, stride):
+        train_df, test_df, _ = load_window_split(train_window, test_window, partitions_dir)
+        X_train, y_train = split_xy(train_df)
+        X_test, y_test = split_xy(test_df)
+        model = build_model(y_train)
+        model.fit(X_train, y_train, verbose=False)
+        metrics = evaluate_model(model, X_test, y_test)
+        results.append({
+            'train_window': list(train_window),
+            'test_window': list(test_window),
+            'train_rows': len(X_train),
+            'test_rows': len(X_test),
+            'auc_roc': metrics['auc_roc'],
+            'auc_pr': metrics['auc_pr'],
+            'tiers': metrics['tiers'],
+        })
+        logger.info(f"Backtest {train_window} -> {test_window}: AUC-PR {metrics['auc_pr']}")
+    
+    MODELS_DIR.mkdir(parents=True, exist_ok=True)
+    backtest_path = MODELS_DIR / f'backtest_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json'
+    with open(backtest_path, 'w') as f:
+        json.dump(results, f, indent=2)
+    logger.info(f"Backtest of {len(results)} windows saved to {backtest_path}")
+    return results
+
 if __name__ == "__main__":
-    train_model()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Train the fraud detection model")
+    parser.add_argument('--train-window', type=int, nargs=2, metavar=('FIRST', 'LAST'),
+                        help="Train on steps FIRST..LAST from the step partitions")
+    parser.add_argument('--test-window', type=int, nargs=2, metavar=('FIRST', 'LAST'),
+                        help="Out-of-time test steps (default: latest 30%% of the train window)")
+    parser.add_argument('--backtest', type=int, nargs=3, metavar=('TRAIN', 'TEST', 'STRIDE'),
+                        help="Sliding-window backtest with window lengths in steps")
+    parser.add_argument('--checkpoint-every', type=int, default=CHECKPOINT_EVERY,
+                        help="Save the booster every N boosting rounds")
+    parser.add_argument('--force', action='store_true',
+                        help="Retrain even if a completed run with identical inputs exists")
+    args = parser.parse_args()
+    
+    if args.backtest:
+        backtest(*args.backtest)
+    else:
+        train_model(
+            tuple(args.train_window) if args.train_window else None,
+            tuple(args.test_window) if args.test_window else None,
+            checkpoint_every=args.checkpoint_every,
+            force=args.force
+        )
\ No newline at end of file
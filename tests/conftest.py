@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+# The apps import src modules flat, so the tests do too
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT))
@@ -0,0 +1,105 @@
+import threading
+import time
+
+import pytest
+
+from admission import AdmissionController, Overloaded, queued_seconds
+
+NOW = 1700000000.0
+
+
+@pytest.mark.parametrize('header', [
+    't=1699999999.5',          # nginx ${msec}: seconds with a fraction
+    '1699999999.5',
+    '1699999999500',           # milliseconds
+    't=1699999999500000',      # microseconds
+])
+def test_request_start_units(header):
+    assert queued_seconds(header, now=NOW) == pytest.approx(0.5)
+
+
+@pytest.mark.parametrize('header', [None, '', 'garbage', 't=', 't=nan', 'inf', '-inf'])
+def test_unusable_request_start_counts_as_not_queued(header):
+    assert queued_seconds(header, now=NOW) == 0.0
+
+
+def test_request_start_in_the_future_is_clamped():
+    # The proxy's clock running ahead must not extend the budget
+    assert queued_seconds(f't={NOW + 5}', now=NOW) == 0.0
+
+
+def budget_ms(controller, header_value, request_start=None):
+    return (controller.deadline_from(header_value, request_start) - time.monotonic()) * 1000
+
+
+@pytest.mark.parametrize('header, expected', [
+    (None, 1000), ('250', 250), ('abc', 1000), ('nan', 1000), ('inf', 1000), ('-inf', 1000),
+    ('-5', 0), ('999999', 30000),
+])
+def test_deadline_budget(header, expected):
+    controller = AdmissionController(default_deadline_ms=1000, max_deadline_ms=30000)
+    assert budget_ms(controller, header) == pytest.approx(expected, abs=50)
+
+
+def test_queued_time_counts_against_the_deadline():
+    controller = AdmissionController()
+    remaining = budget_ms(controller, '1000', f't={time.time() - 0.4}')
+    assert remaining == pytest.approx(600, abs=50)
+
+
+def test_stale_request_is_shed_as_deadline_expired():
+    controller = AdmissionController()
+    deadline = controller.deadline_from('500', f't={time.time() - 2}')
+    with pytest.raises(Overloaded) as info:
+        with controller.admit(deadline):
+            pass
+    assert info.value.reason == 'deadline_expired'
+    snapshot = controller.snapshot()
+    assert snapshot['shed_deadline_expired'] == 1 and snapshot['admitted'] == 0
+
+
+def test_full_controller_sheds_as_queue_timeout():
+    controller = AdmissionController(max_inflight=1)
+    holding, release = threading.Event(), threading.Event()
+
+    def hold_slot():
+        with controller.admit(time.monotonic() + 5):
+            holding.set()
+            release.wait(5)
+
+    worker = threading.Thread(target=hold_slot)
+    worker.start()
+    holding.wait(5)
+    try:
+        started = time.monotonic()
+        with pytest.raises(Overloaded) as info:
+            with controller.admit(time.monotonic() + 0.1):
+                pass
+        # Waited for a slot only as long as the deadline allowed
+        assert 0.09 <= time.monotonic() - started < 1
+        assert info.value.reason == 'queue_timeout'
+        assert controller.snapshot()['inflight'] == 1 and controller.busy
+    finally:
+        release.set()
+        worker.join()
+    snapshot = controller.snapshot()
+    assert (snapshot['admitted'], snapshot['completed'], snapshot['shed_queue_timeout']) == (1, 1, 1)
+    assert snapshot['inflight'] == 0 and snapshot['peak_inflight'] == 1
+    assert snapshot['waiting'] == 0 and not controller.busy
+
+
+def test_check_deadline():
+    controller = AdmissionController()
+    controller.check_deadline(time.monotonic() + 1)
+    with pytest.raises(Overloaded):
+        controller.check_deadline(time.monotonic() - 0.001)
+    assert controller.snapshot()['shed_deadline_expired'] == 1
+
+
+def test_reject_counts_the_reason_in_the_shed_total():
+    controller = AdmissionController()
+    error = controller.reject('model_loading')
+    assert isinstance(error, Overloaded) and error.reason == 'model_loading'
+    controller.record_fallback()
+    snapshot = controller.snapshot()
+    assert snapshot['shed_model_loading'] == 1 and snapshot['shed'] == 1 and snapshot['fallback'] == 1
@@ -0,0 +1,116 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from batch import BatchSummary, prepare_chunk, score_chunks
+from features import FEATURE_COLUMNS, TYPE_MAP
+from rules import TIER_NAMES
+
+
+class AmountModel:
+    """Fraud probability grows with the amount, so every tier gets some rows"""
+
+    def predict_proba(self, X):
+        p = np.clip(X[:, FEATURE_COLUMNS.index('amount')] / 1000.0, 0, 1)
+        return np.column_stack([1 - p, p])
+
+
+def upload(n=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'step': rng.integers(1, 700, n),
+        'type': rng.choice(list(TYPE_MAP), n),
+        'amount': rng.uniform(0, 1000, n).round(2),
+        'oldbalanceOrg': rng.uniform(0, 5000, n).round(2),
+        'newbalanceOrg': 0.0,
+        'oldbalanceDest': rng.choice([0.0, 100.0], n),
+        'newbalanceDest': rng.choice([0.0, 200.0], n),
+        'nameOrig': 'C1',
+        'nameDest': rng.choice(['C1', 'C2'], n),
+    })
+
+
+def test_prepare_chunk_builds_the_model_matrix():
+    chunk = upload(5)
+    X = prepare_chunk(chunk.copy())
+    assert X.dtype == np.float32 and X.shape == (5, len(FEATURE_COLUMNS))
+    assert X[:, 1].tolist() == [TYPE_MAP[t] for t in chunk['type']]
+    np.testing.assert_allclose(X[:, 2], chunk['amount'], rtol=1e-6)
+
+
+def test_optional_step_and_raw_header():
+    chunk = upload(3).drop(columns=['step']).rename(columns={'newbalanceOrg': 'newbalanceOrig'})
+    X = prepare_chunk(chunk)
+    assert X[:, 0].tolist() == [1, 1, 1]
+
+
+@pytest.mark.parametrize('column, value, message', [
+    ('amount', np.nan, 'Empty values'),
+    ('step', 2.5, 'whole numbers'),
+    ('step', 40000, 'outside the int16 range'),
+    ('type', 'WIRE', 'Unknown transaction types: WIRE'),
+    ('amount', 'lots', 'Unable to parse'),
+    ('oldbalanceOrg', np.inf, 'non-finite'),
+])
+def test_bad_uploads_are_rejected(column, value, message):
+    chunk = upload(4)
+    chunk[column] = chunk[column].astype(object)
+    chunk.loc[2, column] = value
+    with pytest.raises(ValueError, match=message):
+        prepare_chunk(chunk)
+
+
+def test_missing_column_is_rejected():
+    with pytest.raises(ValueError, match='Missing required columns: amount'):
+        prepare_chunk(upload(4).drop(columns=['amount']))
+
+
+def test_empty_cells_read_from_csv_are_rejected():
+    text = upload(3).to_csv(index=False).replace('C2', 'C3').splitlines()
+    fields = text[2].split(',')
+    fields[0] = ''
+    text[2] = ','.join(fields)
+    chunk = pd.read_csv(io.StringIO('\n'.join(text)))
+    with pytest.raises(ValueError, match="Empty values in columns: {'step': 1}"):
+        prepare_chunk(chunk)
+
+
+def run(frame, chunk_size):
+    # Same reader as the upload page; its chunks keep counting the index up from 0
+    chunks = pd.read_csv(io.StringIO(frame.to_csv(index=False)), chunksize=chunk_size)
+    scored = []
+    summary = None
+    for scored_chunk, summary in score_chunks(AmountModel(), chunks):
+        scored.append(scored_chunk)
+    return pd.concat(scored), summary
+
+
+def test_scored_rows_carry_probability_tier_and_factors():
+    frame = upload(200)
+    scored, _ = run(frame, 64)
+    np.testing.assert_allclose(scored['fraud_probability'], frame['amount'] / 1000, rtol=1e-5)
+    assert set(scored['risk_level']) <= set(TIER_NAMES)
+    assert scored.loc[scored['fraud_probability'] > 0.7, 'risk_level'].eq('HIGH').all()
+    transfers = scored['type'].isin(['TRANSFER', 'CASH_OUT'])
+    assert scored.loc[transfers, 'risk_factors'].str.contains('transactions have higher risk').all()
+
+
+def test_summary_does_not_depend_on_chunk_size():
+    frame = upload(1000, seed=3)
+    _, whole = run(frame, len(frame))
+    for chunk_size in (7, 97, 333):
+        _, summary = run(frame, chunk_size)
+        assert summary.rows == whole.rows == len(frame)
+        assert summary.mean_probability == pytest.approx(whole.mean_probability)
+        assert summary.tier_counts.tolist() == whole.tier_counts.tolist()
+        assert summary.histogram.tolist() == whole.histogram.tolist()
+        assert summary.rule_hits == whole.rule_hits
+
+
+def test_summary_frames():
+    summary = BatchSummary(bins=4).update(np.array([0.1, 0.5, 0.9]), np.array([0, 1, 2]), {})
+    assert summary.tier_frame()['transactions'].tolist() == [1, 1, 1]
+    assert summary.histogram_frame()['fraud_probability'].tolist() == ['0.00-0.25', '0.25-0.50', '0.50-0.75', '0.75-1.00']
+    assert summary.histogram.tolist() == [1, 0, 1, 1]
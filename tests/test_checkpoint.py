@@ -0,0 +1,112 @@
+import os
+
+import numpy as np
+import pytest
+import xgboost as xgb
+
+from checkpoint import STATE_FILE, TrainingRun, fingerprint_inputs, prune_runs
+from train_model import fit_with_checkpoints
+
+ROUNDS = 12
+
+
+class CrashingRun(TrainingRun):
+    """Simulates the process dying right after the checkpoint at a given round"""
+
+    crash_after = None
+
+    def save_booster(self, model, rounds, status='training'):
+        super().save_booster(model, rounds, status)
+        if rounds == self.crash_after:
+            raise KeyboardInterrupt
+
+
+@pytest.fixture(scope='module')
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2000, 5)).astype(np.float32)
+    y = (X[:, 0] + X[:, 1] * X[:, 2] + rng.normal(scale=0.5, size=2000) > 1).astype(int)
+    return X[:1500], y[:1500], X[1500:], y[1500:]
+
+
+def classifier():
+    return xgb.XGBClassifier(n_estimators=ROUNDS, max_depth=3, tree_method='hist', n_jobs=1)
+
+
+def test_resume_matches_uninterrupted_training(tmp_path, data):
+    X_train, y_train, X_test, y_test = data
+    straight = classifier().fit(X_train, y_train)
+
+    run = CrashingRun(tmp_path, 'abc')
+    run.crash_after = 5
+    with pytest.raises(KeyboardInterrupt):
+        fit_with_checkpoints(classifier(), run, X_train, y_train, X_test, y_test, checkpoint_every=5)
+    run = TrainingRun(tmp_path, 'abc')
+    assert run.rounds == 5 and run.state['status'] == 'training'
+
+    resumed = fit_with_checkpoints(classifier(), run, X_train, y_train, X_test, y_test, checkpoint_every=5)
+    assert resumed.get_booster().num_boosted_rounds() == ROUNDS
+    assert run.state['status'] == 'boosted'
+    np.testing.assert_allclose(resumed.predict_proba(X_test), straight.predict_proba(X_test), rtol=1e-6)
+
+
+def test_boosted_run_is_loaded_without_training(tmp_path, data):
+    X_train, y_train, X_test, y_test = data
+    run = TrainingRun(tmp_path, 'abc')
+    first = fit_with_checkpoints(classifier(), run, X_train, y_train, X_test, y_test)
+    again = fit_with_checkpoints(classifier(), TrainingRun(tmp_path, 'abc'), X_train, y_train, X_test, y_test)
+    np.testing.assert_array_equal(again.predict_proba(X_test), first.predict_proba(X_test))
+
+
+def test_split_round_trip_and_reset(tmp_path):
+    run = TrainingRun(tmp_path, 'abc')
+    assert run.load_split() is None
+    run.save_split(train_index=np.arange(5), test_index=np.arange(5, 7))
+    split = run.load_split()
+    assert split['train_index'].tolist() == [0, 1, 2, 3, 4] and split['test_index'].tolist() == [5, 6]
+    run.reset()
+    assert run.load_split() is None and run.state['status'] == 'new'
+
+
+def test_complete_run_restores_published_artifacts(tmp_path):
+    model_path = tmp_path / 'model.pkl'
+    shared_path = tmp_path / 'importance.json'
+    model_path.write_text('model a')
+    shared_path.write_text('importance a')
+    run = TrainingRun(tmp_path, 'abc')
+    run.save_split(train_index=np.arange(3))
+    run.mark_complete(model_path, published=[model_path, shared_path])
+    assert run.load_split() is None
+
+    # Another run overwrote the shared artifact; the completed run puts its copy back
+    shared_path.write_text('importance b')
+    run = TrainingRun(tmp_path, 'abc')
+    assert run.completed_artifact == model_path
+    assert run.restore() == [str(model_path), str(shared_path)]
+    assert shared_path.read_text() == 'importance a'
+
+    # Without its published copies a run no longer counts as complete
+    (run.directory / 'published' / 'importance.json').unlink()
+    assert TrainingRun(tmp_path, 'abc').completed_artifact is None
+
+
+def test_prune_keeps_newest_and_current(tmp_path):
+    for i, name in enumerate(['a', 'b', 'c', 'd']):
+        run = TrainingRun(tmp_path, name)
+        run.save_split(index=np.arange(1))
+        run._update_state(status='complete')
+        mtime = 1000000 + i
+        os.utime(run.directory / STATE_FILE, (mtime, mtime))
+    removed = prune_runs(tmp_path, keep=2, current='a')
+    assert sorted(d.name for d in removed) == ['b']
+    assert sorted(d.name for d in (tmp_path / 'checkpoints').iterdir()) == ['a', 'c', 'd']
+
+
+def test_fingerprint_depends_on_data_and_config(tmp_path):
+    path = tmp_path / 'data.csv'
+    path.write_text('a,b\n1,2\n')
+    base = fingerprint_inputs([path], {'rounds': 10})
+    assert fingerprint_inputs([path], {'rounds': 10}) == base
+    assert fingerprint_inputs([path], {'rounds': 11}) != base
+    path.write_text('a,b\n1,3\n')
+    assert fingerprint_inputs([path], {'rounds': 10}) != base
@@ -0,0 +1,149 @@
+import os
+
+import numpy as np
+import pytest
+
+from drift import (
+    MIN_OBSERVATIONS, DriftMonitor, DriftSketch, HistogramSketch, drift_report, ks_statistic, psi
+)
+from features import FEATURE_COLUMNS
+
+EPOCH = 3600
+
+
+class FakeClock:
+    def __init__(self, now=100 * EPOCH):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(scope='module')
+def reference():
+    rng = np.random.default_rng(0)
+    X = rng.lognormal(5, 1, size=(5000, len(FEATURE_COLUMNS)))
+    X[:, 1] = rng.integers(0, 5, size=5000)
+    return DriftSketch.fit(X, rng.random(5000)), X
+
+
+def monitor(reference, tmp_path, clock, **kwargs):
+    return DriftMonitor(reference, str(tmp_path), flush_seconds=0, epoch_seconds=EPOCH, clock=clock, **kwargs)
+
+
+def feed(m, X, n, offset=0):
+    for row in X[offset:offset + n]:
+        m.update(row, 0.5)
+
+
+def test_histogram_buckets_and_merge():
+    a = HistogramSketch([1.0, 2.0])
+    a.update_many([0.5, 1.0, 1.5, 2.0, 9.0])
+    assert a.counts.tolist() == [1, 2, 2]
+    b = HistogramSketch([1.0, 2.0])
+    b.update(1.5)
+    assert a.merge(b).counts.tolist() == [1, 3, 2] and a.total == 6
+    with pytest.raises(ValueError):
+        a.merge(HistogramSketch([1.0, 3.0]))
+
+
+def test_scalar_and_batch_updates_agree():
+    values = np.random.default_rng(1).normal(size=500)
+    batch = HistogramSketch.from_sample(values)
+    scalar = batch.empty_like()
+    for value in values:
+        scalar.update(value)
+    assert scalar.counts.tolist() == batch.counts.tolist()
+
+
+def test_identical_distributions_are_stable():
+    counts = np.array([10, 20, 30])
+    assert psi(counts, counts * 3) == pytest.approx(0.0, abs=1e-9)
+    assert ks_statistic(counts, counts * 3) == pytest.approx(0.0)
+    assert psi(counts, [30, 20, 10]) > 0.25
+
+
+def test_report_needs_enough_observations(reference, tmp_path):
+    sketch, X = reference
+    m = monitor(sketch, tmp_path, FakeClock())
+    assert drift_report(sketch, m.current)['columns']['amount']['status'] == 'no data'
+    feed(m, X, MIN_OBSERVATIONS - 1)
+    assert m.report()['columns']['amount']['status'] == 'insufficient data'
+    feed(m, X, 1, offset=MIN_OBSERVATIONS - 1)
+    report = m.report()
+    assert report['observations'] == MIN_OBSERVATIONS
+    assert report['columns']['amount']['status'] == 'stable'
+
+
+def test_workers_are_merged(reference, tmp_path):
+    sketch, X = reference
+    clock = FakeClock()
+    workers = [monitor(sketch, tmp_path, clock) for _ in range(3)]
+    for i, m in enumerate(workers):
+        m._pid = os.getpid()
+        m._worker_id = f'worker{i}'
+        feed(m, X, 100 * (i + 1))
+        m.flush()
+    assert len(os.listdir(workers[0].directory)) == 3
+    assert workers[0].merged().total == 600
+
+
+def test_epoch_rollover_keeps_finished_counts(reference, tmp_path):
+    sketch, X = reference
+    clock = FakeClock()
+    m = monitor(sketch, tmp_path, clock)
+    feed(m, X, 50)
+    clock.now += EPOCH
+    feed(m, X, 30)
+    assert m.current.total == 30
+    assert m.merged().total == 80
+    assert sorted(name.split('-')[0] for name in os.listdir(m.directory)) == ['100', '101']
+
+
+def test_window_expires_old_epochs(reference, tmp_path):
+    sketch, X = reference
+    clock = FakeClock()
+    m = monitor(sketch, tmp_path, clock, window_epochs=2)
+    feed(m, X, 40)
+    m.flush()
+    clock.now += EPOCH
+    feed(m, X, 20)
+    assert m.merged().total == 60
+    clock.now += EPOCH
+    feed(m, X, 10)
+    # Epoch 100 is outside the 2-epoch window now: excluded and deleted
+    assert m.merged().total == 30
+    assert sorted(name.split('-')[0] for name in os.listdir(m.directory)) == ['101', '102']
+    assert m.report()['window_seconds'] == 2 * EPOCH
+
+
+def test_update_does_not_write(reference, tmp_path):
+    sketch, X = reference
+    m = monitor(sketch, tmp_path, FakeClock())
+    feed(m, X, 1000)
+    assert not os.path.exists(m.directory)
+    m.flush()
+    assert len(os.listdir(m.directory)) == 1
+
+
+def test_background_flusher_writes_periodically(reference, tmp_path):
+    sketch, X = reference
+    m = DriftMonitor(sketch, str(tmp_path), flush_seconds=0.05)
+    try:
+        feed(m, X, 10)
+        for _ in range(100):
+            if os.path.isdir(m.directory) and os.listdir(m.directory):
+                break
+            m._stop.wait(0.02)
+        [name] = os.listdir(m.directory)
+        assert DriftSketch.load(os.path.join(m.directory, name)).total == 10
+    finally:
+        m.close()
+
+
+def test_reference_round_trip(reference, tmp_path):
+    sketch, _ = reference
+    path = sketch.save(str(tmp_path / 'reference.json'))
+    loaded = DriftSketch.load(path)
+    assert loaded.fingerprint == sketch.fingerprint
+    assert all(loaded.sketches[c].counts.tolist() == s.counts.tolist() for c, s in sketch.sketches.items())
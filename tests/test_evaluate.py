@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from sklearn.metrics import average_precision_score, confusion_matrix, roc_auc_score
+
+from evaluate import StreamingEvaluator
+
+
+def _scored(n=20000, seed=0):
+    rng = np.random.default_rng(seed)
+    y = rng.random(n) < 0.05
+    # Scores at the centres of the 10000 histogram bins, so binning loses nothing
+    bins = np.clip(rng.normal(0.25 + 0.4 * y, 0.2) * 10000, 0, 9999).astype(int)
+    score = (bins + 0.5) / 10000
+    return y.astype(int), score
+
+
+def _fed_in_chunks(y, score, chunk_size=3000):
+    evaluator = StreamingEvaluator()
+    for start in range(0, len(y), chunk_size):
+        evaluator.update(y[start:start + chunk_size], score[start:start + chunk_size])
+    return evaluator
+
+
+def test_auc_matches_sklearn():
+    y, score = _scored()
+    metrics = _fed_in_chunks(y, score).finalize()
+    assert metrics['n_samples'] == len(y)
+    assert metrics['n_positive'] == y.sum()
+    assert metrics['auc_roc'] == pytest.approx(roc_auc_score(y, score), abs=1e-9)
+    assert metrics['auc_pr'] == pytest.approx(average_precision_score(y, score), abs=1e-9)
+
+
+def test_confusion_matches_sklearn_at_every_threshold():
+    y, score = _scored()
+    metrics = _fed_in_chunks(y, score).finalize()
+    for row in metrics['thresholds']:
+        tn, fp, fn, tp = confusion_matrix(y, score > row['threshold'], labels=[0, 1]).ravel()
+        assert (row['tp'], row['fp'], row['tn'], row['fn']) == (tp, fp, tn, fn), row['threshold']
+
+
+def test_chunking_does_not_change_metrics():
+    y, score = _scored(seed=1)
+    assert _fed_in_chunks(y, score, 997).finalize() == _fed_in_chunks(y, score, len(y)).finalize()
+
+
+def test_single_class_has_no_auc():
+    metrics = StreamingEvaluator().update(np.zeros(10), np.linspace(0, 1, 10)).finalize()
+    assert metrics['auc_roc'] is None
+    assert metrics['auc_pr'] is None
+    assert metrics['tiers']['HIGH']['recall'] is None
+
+
+def test_shape_mismatch_is_rejected():
+    with pytest.raises(ValueError):
+        StreamingEvaluator().update(np.zeros(3), np.zeros(4))
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+
+from explain import Explainer, compute_global_importance
+from features import FEATURE_COLUMNS
+
+
+@pytest.fixture(scope='module')
+def model_and_rows():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.random((400, len(FEATURE_COLUMNS))), columns=FEATURE_COLUMNS)
+    y = (X['amount'] + 0.5 * X['oldbalanceOrg'] > 0.9).astype(int)
+    model = xgb.XGBClassifier(n_estimators=20, max_depth=3, n_jobs=1)
+    model.fit(X, y)
+    return model, X.iloc[:25]
+
+
+def test_contributions_sum_to_margin(model_and_rows):
+    model, X = model_and_rows
+    explainer = Explainer(model)
+    contribs = explainer.contributions(X)
+    margin = model.get_booster().predict(xgb.DMatrix(X.to_numpy(np.float32), feature_names=FEATURE_COLUMNS),
+                                         output_margin=True)
+    assert contribs.shape == (len(X), len(FEATURE_COLUMNS) + 1)
+    np.testing.assert_allclose(contribs.sum(axis=1), margin, rtol=1e-5, atol=1e-5)
+    for explanation, expected in zip(explainer.explain_batch(X), margin):
+        total = explanation['bias'] + sum(item['value'] for item in explanation['contributions'])
+        assert total == pytest.approx(expected, abs=1e-5)
+
+
+def test_explain_matches_batch(model_and_rows):
+    model, X = model_and_rows
+    explainer = Explainer(model)
+    batch = explainer.explain_batch(X, top_k=3)
+    for row, expected in zip(X.to_numpy(), batch):
+        single = explainer.explain(row)
+        assert single['bias'] == pytest.approx(expected['bias'])
+        assert [item['feature'] for item in single['contributions'][:3]] == \
+            [item['feature'] for item in expected['contributions']]
+        assert [item['value'] for item in single['contributions'][:3]] == \
+            pytest.approx([item['value'] for item in expected['contributions']])
+
+
+def test_explain_returns_independent_copies(model_and_rows):
+    model, X = model_and_rows
+    explainer = Explainer(model)
+    first = explainer.explain(X.iloc[0])
+    first['contributions'][0]['value'] = 1e9
+    assert explainer.explain(X.iloc[0])['contributions'][0]['value'] != 1e9
+
+
+def test_top_k_orders_by_absolute_contribution(model_and_rows):
+    model, X = model_and_rows
+    explainer = Explainer(model)
+    full = explainer.explain_batch(X)
+    top = explainer.explain_batch(X, top_k=2)
+    for complete, cut in zip(full, top):
+        magnitudes = [abs(item['value']) for item in complete['contributions']]
+        assert magnitudes == sorted(magnitudes, reverse=True)
+        assert len(complete['contributions']) == len(FEATURE_COLUMNS)
+        assert cut['contributions'] == complete['contributions'][:2]
+
+
+@pytest.mark.parametrize('top_k', [0, -1, 1.5, True, '2'])
+def test_invalid_top_k(model_and_rows, top_k):
+    model, X = model_and_rows
+    with pytest.raises(ValueError):
+        Explainer(model).explain_batch(X, top_k=top_k)
+
+
+def test_global_importance_shares(model_and_rows):
+    model, X = model_and_rows
+    importance = compute_global_importance(model, X, max_rows=10)
+    assert set(importance) == set(FEATURE_COLUMNS)
+    assert sum(importance.values()) == pytest.approx(1.0)
+    assert list(importance.values()) == sorted(importance.values(), reverse=True)
+    assert next(iter(importance)) in ('amount', 'oldbalanceOrg')
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from features import FEATURE_COLUMNS, SCHEMA, TARGET_COLUMN, coerce_frame, rename_raw_columns, validate_frame
+
+
+def raw_chunk(**overrides):
+    columns = {
+        'step': [1, 2], 'type': [4, 1], 'amount': [181.0, 9.5],
+        'oldbalanceOrg': [181.0, 10.0], 'newbalanceOrig': [0.0, 0.5],
+        'oldbalanceDest': [0.0, 3.0], 'newbalanceDest': [0.0, 12.5], TARGET_COLUMN: [1, 0],
+    }
+    columns.update(overrides)
+    return pd.DataFrame(columns)
+
+
+def test_raw_paysim_header_is_renamed():
+    chunk = validate_frame(coerce_frame(rename_raw_columns(raw_chunk())), require_target=True)
+    assert list(chunk.columns) == FEATURE_COLUMNS + [TARGET_COLUMN]
+    assert chunk.dtypes.to_dict() == SCHEMA
+    assert chunk['newbalanceOrg'].tolist() == [0.0, 0.5]
+
+
+def test_rename_keeps_an_existing_schema_column():
+    chunk = rename_raw_columns(raw_chunk(newbalanceOrg=[7.0, 8.0]))
+    assert chunk['newbalanceOrg'].tolist() == [7.0, 8.0] and 'newbalanceOrig' in chunk
+
+
+def test_missing_column_fails_validation():
+    with pytest.raises(ValueError, match='newbalanceOrg'):
+        validate_frame(coerce_frame(raw_chunk()))
+
+
+def test_wrong_dtype_fails_validation():
+    chunk = coerce_frame(rename_raw_columns(raw_chunk()))
+    chunk['amount'] = chunk['amount'].astype(np.float64)
+    with pytest.raises(TypeError):
+        validate_frame(chunk)
+
+
+@pytest.mark.parametrize('column, values', [('step', [1, 40000]), ('amount', [1.0, np.inf])])
+def test_coerce_rejects_values_outside_the_schema(column, values):
+    with pytest.raises(ValueError, match=column):
+        coerce_frame(rename_raw_columns(raw_chunk(**{column: values})))
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from features import coerce_frame, encode_types, rename_raw_columns, validate_frame
+from generate_data import MAX_FRAUD_RATE, RAW_COLUMNS, check_arguments, generate_chunks, generate_csv
+
+ROWS = 25000
+CHUNK_SIZE = 4000
+
+
+def test_output_is_identical_for_any_worker_count(tmp_path):
+    outputs = [
+        generate_csv(tmp_path / f'w{workers}.csv', ROWS, CHUNK_SIZE, seed=7, workers=workers).read_bytes()
+        for workers in (1, 3)
+    ]
+    assert outputs[0] == outputs[1]
+    expected = pd.concat(generate_chunks(ROWS, CHUNK_SIZE, seed=7), ignore_index=True)
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / 'w1.csv'), expected, check_dtype=False)
+
+
+def test_header_matches_the_raw_paysim_schema(tmp_path):
+    path = generate_csv(tmp_path / 'raw.csv', 100, workers=1)
+    assert path.read_text().splitlines()[0].split(',') == RAW_COLUMNS
+    assert 'newbalanceOrig' in RAW_COLUMNS
+
+
+def test_output_passes_the_preprocessing_schema():
+    chunk = next(generate_chunks(2000)).drop(columns=['nameOrig', 'nameDest', 'isFlaggedFraud'])
+    chunk['type'] = encode_types(chunk['type'])
+    validate_frame(coerce_frame(rename_raw_columns(chunk)), require_target=True)
+
+
+@pytest.mark.parametrize('fraud_rate', [0.00129, 0.05, MAX_FRAUD_RATE])
+def test_fraud_rate_is_honoured(fraud_rate):
+    frame = pd.concat(generate_chunks(200000, 50000, seed=3, fraud_rate=fraud_rate))
+    observed = frame['isFraud'].mean()
+    # Binomial standard error, with a floor for the rate at the cap (no randomness left)
+    tolerance = 5 * max(np.sqrt(fraud_rate * (1 - fraud_rate) / len(frame)), 1e-4)
+    assert abs(observed - fraud_rate) < tolerance
+    assert frame.loc[frame['isFraud'] == 1, 'type'].isin(['TRANSFER', 'CASH_OUT']).all()
+
+
+def test_steps_are_ordered_and_cover_the_range():
+    steps = pd.concat(generate_chunks(ROWS, CHUNK_SIZE, max_step=100))['step'].to_numpy()
+    assert (np.diff(steps) >= 0).all()
+    assert steps[0] == 1 and steps[-1] == 100
+
+
+@pytest.mark.parametrize('n_rows, fraud_rate', [(0, 0.01), (-5, 0.01), (10, 0.9), (10, -0.1)])
+def test_invalid_arguments_are_rejected(n_rows, fraud_rate):
+    with pytest.raises(ValueError):
+        check_arguments(n_rows, fraud_rate)
+    with pytest.raises(ValueError):
+        next(generate_chunks(n_rows, fraud_rate=fraud_rate))
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from features import FEATURE_COLUMNS, TARGET_COLUMN
+from partitions import (
+    PartitionWriter, iter_window_chunks, load_manifest, read_window, select_partitions, sliding_windows
+)
+
+
+def test_sliding_windows_default_stride():
+    assert list(sliding_windows(1, 100, train_steps=48, test_steps=24)) == [
+        ((1, 48), (49, 72)),
+        ((25, 72), (73, 96)),
+    ]
+
+
+def test_sliding_windows_custom_stride_ends_inside_range():
+    windows = list(sliding_windows(1, 30, train_steps=10, test_steps=5, stride=3))
+    assert windows[0] == ((1, 10), (11, 15))
+    assert windows[-1] == ((16, 25), (26, 30))
+    assert [train[0] for train, _ in windows] == [1, 4, 7, 10, 13, 16]
+    for train, test in windows:
+        assert test[0] == train[1] + 1 and test[1] <= 30
+
+
+def test_sliding_windows_range_too_short():
+    assert list(sliding_windows(1, 20, train_steps=15, test_steps=6)) == []
+
+
+@pytest.fixture
+def partitioned(tmp_path):
+    rng = np.random.default_rng(0)
+    steps = np.sort(rng.integers(1, 73, size=500))
+    frame = pd.DataFrame({
+        'step': steps,
+        'type': rng.integers(0, 5, size=500),
+        **{col: rng.random(500).round(2) for col in FEATURE_COLUMNS[2:]},
+        TARGET_COLUMN: rng.random(500) < 0.1,
+    })
+    writer = PartitionWriter(tmp_path)
+    for start in range(0, len(frame), 120):
+        writer.write(frame.iloc[start:start + 120])
+    writer.close()
+    return tmp_path, frame
+
+
+def test_manifest_lists_one_partition_per_day(partitioned):
+    directory, frame = partitioned
+    manifest = load_manifest(directory)
+    assert [(p['step_start'], p['step_end']) for p in manifest['partitions']] == [(1, 24), (25, 48), (49, 72)]
+    assert sum(p['rows'] for p in manifest['partitions']) == len(frame)
+    assert sum(p['frauds'] for p in manifest['partitions']) == frame[TARGET_COLUMN].sum()
+
+
+def test_windows_prune_partitions(partitioned):
+    directory, _ = partitioned
+    manifest = load_manifest(directory)
+    assert [p['step_start'] for p in select_partitions(manifest, 30, 40)] == [25]
+    assert [p['step_start'] for p in select_partitions(manifest, 20, 30)] == [1, 25]
+    assert [p['step_start'] for p in select_partitions(manifest, end_step=24)] == [1]
+
+
+def test_read_window_returns_exactly_the_window(partitioned):
+    directory, frame = partitioned
+    window = read_window(directory, 20, 50)
+    expected = frame[(frame['step'] >= 20) & (frame['step'] <= 50)]
+    assert len(window) == len(expected)
+    np.testing.assert_array_equal(window['step'].to_numpy(), expected['step'].to_numpy())
+    chunks = list(iter_window_chunks(directory, 20, 50, columns=['amount']))
+    assert all(list(chunk.columns) == ['amount'] for chunk in chunks)
+
+
+def test_empty_window_raises(partitioned):
+    directory, _ = partitioned
+    with pytest.raises(ValueError):
+        read_window(directory, 100, 200)
@@ -0,0 +1,108 @@
+import json
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from features import FEATURE_COLUMNS
+from payload import PayloadError, TransactionParser, dumps, loads, parse_top_k
+
+VALID = {
+    'step': 5, 'type': 'TRANSFER', 'amount': 181.0,
+    'oldbalanceOrg': 181.0, 'newbalanceOrg': 0.0,
+    'oldbalanceDest': 0.0, 'newbalanceDest': 0.0,
+    'sender': 'C1', 'recipient': 'C2',
+}
+
+
+@pytest.fixture(scope='module')
+def parser():
+    return TransactionParser()
+
+
+def errors_of(call, *args):
+    with pytest.raises(PayloadError) as info:
+        call(*args)
+    return info.value.errors
+
+
+def test_valid_transaction_fills_the_feature_row(parser):
+    row, fields = parser.parse(VALID)
+    assert row.shape == (1, len(FEATURE_COLUMNS)) and row.dtype == np.float32
+    assert row[0].tolist() == [5, 4, 181.0, 181.0, 0.0, 0.0, 0.0]
+    assert fields == VALID
+
+
+def test_absent_fields_take_defaults(parser):
+    row, fields = parser.parse({})
+    assert fields['step'] == 1 and fields['type'] == 'PAYMENT' and fields['sender'] == ''
+    assert row[0].tolist() == [1, 3, 0, 0, 0, 0, 0]
+
+
+def test_numeric_strings_are_accepted(parser):
+    _, fields = parser.parse({**VALID, 'step': ' +7 ', 'amount': '12.5'})
+    assert fields['step'] == 7 and fields['amount'] == 12.5
+
+
+@pytest.mark.parametrize('field, value, message', [
+    ('step', 'abc', 'must be an integer'),
+    ('step', '-+5', 'must be an integer'),
+    ('step', '--5', 'must be an integer'),
+    ('step', '²', 'must be an integer'),
+    ('step', 1.5, 'must be an integer'),
+    ('step', True, 'must be an integer'),
+    ('step', None, 'must be an integer'),
+    ('step', 40000, 'must be between -32768 and 32767'),
+    ('amount', 'lots', 'must be a number'),
+    ('amount', False, 'must be a number'),
+    ('amount', [1], 'must be a number'),
+    ('amount', 'nan', 'must be a finite number'),
+    ('amount', 1e300, 'must be a finite number'),
+    ('type', 'WIRE', 'must be one of CASH_IN, CASH_OUT, DEBIT, PAYMENT, TRANSFER'),
+    ('sender', 42, 'must be a string'),
+])
+def test_field_errors(parser, field, value, message):
+    assert errors_of(parser.parse, {**VALID, field: value}) == {field: message}
+
+
+def test_every_bad_field_is_reported(parser):
+    errors = errors_of(parser.parse, {**VALID, 'step': 'x', 'amount': None, 'type': 'WIRE'})
+    assert set(errors) == {'step', 'amount', 'type'}
+
+
+def test_body_must_be_an_object(parser):
+    assert errors_of(parser.parse, [VALID]) == {'body': 'must be a JSON object'}
+
+
+def test_batch_errors_are_prefixed_by_index(parser):
+    errors = errors_of(parser.parse_batch, [VALID, {**VALID, 'amount': 'x'}, 'nope'])
+    assert errors == {
+        'transactions[1].amount': 'must be a number',
+        'transactions[2]': 'must be a JSON object',
+    }
+
+
+def test_batch_matches_single_parse(parser):
+    transactions = [VALID, {**VALID, 'type': 'CASH_IN', 'step': 9}, {}]
+    X = parser.parse_batch(transactions)
+    for i, transaction in enumerate(transactions):
+        np.testing.assert_array_equal(X[i], parser.parse(transaction)[0][0])
+
+
+@pytest.mark.parametrize('value', ['a', -1, 0, True, 2.5])
+def test_top_k_must_be_positive_integer(value):
+    assert errors_of(parse_top_k, value) == {'top_k': 'must be a positive integer'}
+
+
+def test_top_k_is_optional():
+    assert parse_top_k(None) is None
+    assert parse_top_k(3) == 3
+
+
+def test_invalid_json_body():
+    assert errors_of(loads, b'{"amount": ') == {'body': 'must be valid JSON'}
+
+
+def test_dumps_handles_numpy_and_datetimes():
+    body = {'p': np.float32(0.5), 'n': np.int64(3), 'a': np.arange(3), 't': datetime(2024, 1, 2, 3, 4, 5)}
+    assert json.loads(dumps(body)) == {'p': 0.5, 'n': 3, 'a': [0, 1, 2], 't': '2024-01-02T03:04:05'}
@@ -0,0 +1,103 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from rules import Rule, RuleEngine, compile_rule, rules_only_tier, tier_of
+
+
+def original_checks(t):
+    """The scalar checks the apps ran before the rule engine"""
+    risk_factors = []
+    if t['amount'] > 10000:
+        risk_factors.append('High transaction amount')
+    if t['oldbalanceOrg'] == t['newbalanceOrg'] + t['amount']:
+        risk_factors.append('Perfect balance consistency')
+    if t['newbalanceDest'] == 0 and t['oldbalanceDest'] == 0:
+        risk_factors.append('Recipient account shows no activity')
+    if t['type'] in ['CASH_OUT', 'TRANSFER']:
+        risk_factors.append(f"{t['type']} transactions have higher risk")
+    return {
+        'risk_factors': risk_factors,
+        'validation': {
+            'balance_consistent': t['oldbalanceOrg'] - t['newbalanceOrg'] == t['amount'],
+            'amount_reasonable': t['amount'] > 0 and t['amount'] < 100000,
+            'different_participants': t['sender'] != t['recipient'],
+        },
+    }
+
+
+def transactions():
+    for type_, amount, old_orig, new_orig, old_dest, new_dest, recipient in itertools.product(
+        ['CASH_OUT', 'PAYMENT', 'TRANSFER'],
+        [0.0, 5000.0, 10000.0, 10000.01, 100000.0],
+        [0.0, 10000.0, 12345.67],
+        [0.0, 2345.67],
+        [0.0, 150.0],
+        [0.0, 20.0],
+        ['C1', 'C2'],
+    ):
+        yield {
+            'step': 1, 'type': type_, 'amount': amount,
+            'oldbalanceOrg': old_orig, 'newbalanceOrg': new_orig,
+            'oldbalanceDest': old_dest, 'newbalanceDest': new_dest,
+            'sender': 'C1', 'recipient': recipient,
+        }
+
+
+@pytest.fixture(scope='module')
+def engine():
+    return RuleEngine()
+
+
+def test_assess_one_matches_original_checks(engine):
+    for t in transactions():
+        assert engine.assess_one(t) == original_checks(t), t
+
+
+def test_batch_matches_original_checks(engine):
+    batch = pd.DataFrame(list(transactions()))
+    assessment = engine.assess(batch)
+    for i, t in enumerate(transactions()):
+        expected = original_checks(t)
+        assert assessment['risk_factors'][i] == expected['risk_factors'], t
+        for name, value in expected['validation'].items():
+            assert assessment['validation'][name][i] == value, (name, t)
+
+
+def test_raw_column_names_are_aliases(engine):
+    t = next(transactions())
+    raw = {k: v for k, v in t.items() if k not in ('sender', 'recipient')}
+    raw.update(nameOrig=t['sender'], nameDest=t['recipient'])
+    assert engine.assess_one(raw) == engine.assess_one(t)
+    assert engine.assess(pd.DataFrame([raw]))['validation']['different_participants'].tolist() == [False]
+
+
+def test_rules_with_missing_columns_are_skipped(engine):
+    t = {k: v for k, v in next(transactions()).items() if k not in ('sender', 'recipient')}
+    assert 'different_participants' not in engine.assess_one(t)['validation']
+    assert 'different_participants' not in engine.evaluate(pd.DataFrame([t]))
+
+
+@pytest.mark.parametrize('expr', ['__import__("os")', 'amount.real', 'unknown > 1', 'amount if amount else 0'])
+def test_unsafe_or_unknown_expressions_are_rejected(expr):
+    for vectorize in (True, False):
+        with pytest.raises(ValueError):
+            compile_rule(Rule('bad', 'risk_factor', expr, 'bad'), vectorize=vectorize)
+
+
+def test_chained_comparison_and_not_in():
+    rule = Rule('mid', 'risk_factor', "0 < amount <= 10 and type not in ('PAYMENT',)", 'mid')
+    engine = RuleEngine([rule])
+    batch = {'amount': np.array([0.0, 5.0, 10.0, 11.0, 5.0]),
+             'type': np.array(['CASH_OUT', 'CASH_OUT', 'TRANSFER', 'CASH_OUT', 'PAYMENT'])}
+    assert engine.evaluate(batch)['mid'].tolist() == [False, True, True, False, False]
+    for i in range(5):
+        fired = engine.assess_one({col: values[i].item() for col, values in batch.items()})['risk_factors']
+        assert bool(fired) == engine.evaluate(batch)['mid'][i]
+
+
+def test_tiers():
+    assert [tier_of(p) for p in (0.0, 0.3, 0.31, 0.7, 0.71)] == ['LOW', 'LOW', 'MEDIUM', 'MEDIUM', 'HIGH']
+    assert [rules_only_tier(n) for n in (0, 1, 2, 3, 4)] == ['LOW', 'LOW', 'MEDIUM', 'HIGH', 'HIGH']
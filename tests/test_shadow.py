@@ -0,0 +1,106 @@
+import threading
+
+import numpy as np
+import pytest
+
+from shadow import ShadowScorer
+
+
+class ColumnModel:
+    """Candidate whose fraud probability is the first feature; records batch sizes"""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.batches = []
+
+    def predict_proba(self, X):
+        self.batches.append(len(X))
+        if self.fail:
+            raise RuntimeError('broken candidate')
+        p = np.asarray(X, dtype=np.float64)[:, 0]
+        return np.column_stack([1 - p, p])
+
+
+def paused_scorer(model, **kwargs):
+    """Scorer whose worker waits (as if production were busy) until resume is set"""
+    resume = threading.Event()
+    return ShadowScorer(model, busy=lambda: not resume.is_set(), **kwargs), resume
+
+
+def submit_rows(scorer, candidate, primary):
+    return [scorer.submit(np.array([[c, 0.0, 0.0]]), p) for c, p in zip(candidate, primary)]
+
+
+def test_queued_rows_are_scored_in_one_batch():
+    model = ColumnModel()
+    scorer, resume = paused_scorer(model)
+    assert all(submit_rows(scorer, [0.1] * 50, [0.1] * 50))
+    assert scorer.snapshot()['scored'] == 0
+    resume.set()
+    scorer.shutdown(wait=True)
+    assert model.batches == [50]
+    snapshot = scorer.snapshot()
+    assert (snapshot['submitted'], snapshot['scored'], snapshot['batches'], snapshot['pending']) == (50, 50, 1, 0)
+
+
+def test_batches_are_capped():
+    model = ColumnModel()
+    scorer, resume = paused_scorer(model, max_batch=20)
+    submit_rows(scorer, [0.5] * 50, [0.5] * 50)
+    resume.set()
+    scorer.shutdown(wait=True)
+    assert model.batches == [20, 20, 10]
+
+
+def test_submissions_beyond_max_pending_are_dropped():
+    model = ColumnModel()
+    scorer, resume = paused_scorer(model, max_pending=8)
+    accepted = submit_rows(scorer, [0.2] * 11, [0.2] * 11)
+    assert accepted == [True] * 8 + [False] * 3
+    resume.set()
+    scorer.shutdown(wait=True)
+    snapshot = scorer.snapshot()
+    assert (snapshot['submitted'], snapshot['dropped'], snapshot['scored']) == (8, 3, 8)
+    assert not scorer.submit(np.zeros((1, 3)), 0.0)
+
+
+def test_tier_matrix_and_deltas():
+    model = ColumnModel()
+    scorer, resume = paused_scorer(model)
+    # (candidate, primary): agree LOW, MEDIUM -> HIGH, HIGH -> LOW, agree HIGH
+    submit_rows(scorer, [0.1, 0.8, 0.2, 0.9], [0.2, 0.5, 0.9, 0.9])
+    resume.set()
+    scorer.shutdown(wait=True)
+    snapshot = scorer.snapshot()
+    matrix = snapshot['tier_matrix']
+    assert matrix['LOW']['LOW'] == 1 and matrix['MEDIUM']['HIGH'] == 1
+    assert matrix['HIGH']['LOW'] == 1 and matrix['HIGH']['HIGH'] == 1
+    assert snapshot['tier_agreement'] == 0.5 and snapshot['tier_disagreements'] == 2
+    deltas = np.array([-0.1, 0.3, -0.7, 0.0])
+    assert snapshot['mean_delta'] == pytest.approx(deltas.mean())
+    assert snapshot['mean_abs_delta'] == pytest.approx(np.abs(deltas).mean())
+    assert snapshot['max_abs_delta'] == pytest.approx(0.7)
+    assert sum(snapshot['delta_histogram']['counts']) == 4
+
+
+def test_candidate_errors_are_counted_per_request():
+    model = ColumnModel(fail=True)
+    scorer, resume = paused_scorer(model)
+    submit_rows(scorer, [0.1] * 5, [0.1] * 5)
+    resume.set()
+    scorer.shutdown(wait=True)
+    snapshot = scorer.snapshot()
+    assert (snapshot['errors'], snapshot['scored']) == (5, 0)
+    assert snapshot['mean_delta'] is None
+
+
+def test_submit_copies_the_row():
+    model = ColumnModel()
+    scorer, resume = paused_scorer(model)
+    row = np.array([[0.4, 0.0, 0.0]], dtype=np.float32)
+    scorer.submit(row, 0.4)
+    # The web app reuses its per-thread input row for the next request
+    row[0, 0] = 0.99
+    resume.set()
+    scorer.shutdown(wait=True)
+    assert scorer.snapshot()['max_abs_delta'] == pytest.approx(0.0, abs=1e-6)
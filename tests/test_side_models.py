@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from features import FEATURE_COLUMNS
+from side_models import SideModelBundle
+
+
+@pytest.fixture(scope='module')
+def fitted():
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(rng.lognormal(8, 2, size=(3000, len(FEATURE_COLUMNS))), columns=FEATURE_COLUMNS)
+    frame[['newbalanceOrg', 'oldbalanceDest']] *= rng.random((3000, 2)) < 0.6
+    bundle = SideModelBundle().fit(lambda: (frame.iloc[i:i + 500] for i in range(0, len(frame), 500)))
+    return bundle, frame
+
+
+def test_assign_one_matches_the_estimators(fitted):
+    bundle, frame = fitted
+    for name in bundle.groups:
+        expected = bundle.kmeans[name].predict(bundle.pca[name].transform(bundle._inputs(frame, name)))
+        got = [bundle.assign_one(row)[f'cluster_{name}'] for row in frame[FEATURE_COLUMNS].to_numpy()]
+        assert got == expected.tolist(), name
+
+
+def test_every_training_row_is_used(fitted):
+    bundle, frame = fitted
+    assert bundle.n_rows_ == len(frame)
+    assert bundle.output_columns == ['cluster_origin', 'cluster_destination', 'cluster_balances']
+
+
+def test_missing_input_columns_are_reported_up_front():
+    with pytest.raises(ValueError, match='newbalanceOrg'):
+        SideModelBundle().check_columns([c for c in FEATURE_COLUMNS if c != 'newbalanceOrg'] + ['newbalanceOrig'])
+    SideModelBundle().check_columns(FEATURE_COLUMNS)
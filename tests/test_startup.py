@@ -0,0 +1,20 @@
+from startup import IMPORT_BUDGET_MS, check_budget, measure_startup, parse_importtime
+
+
+def test_web_app_import_within_budget():
+    report = measure_startup('web_app', wait=False)
+    assert check_budget(report, IMPORT_BUDGET_MS) == [], report['packages_ms']
+
+
+def test_parse_importtime():
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   _json\n"
+        "import time:       300 |        420 | json\n"
+        "unrelated warning\n"
+    )
+    timings = parse_importtime(stderr)
+    assert [(t.module, t.self_us, t.cumulative_us, t.depth) for t in timings] == [
+        ('_json', 120, 120, 1),
+        ('json', 300, 420, 0),
+    ]
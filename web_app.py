@@ -4,14 +4,30 @@ Flask Web Application for Fraud Detection System
 A professional web interface for the fraud detection model
 """
 
-from flask import Flask, render_template, request, jsonify
-import numpy as np
+from flask import Flask, render_template, request
+import logging
 import pickle
 import os
+import sys
+import tempfile
+import threading
+import time
 from datetime import datetime
-import json
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from admission import (
+    DEADLINE_HEADER, DEFAULT_DEADLINE_MS, DEFAULT_MAX_INFLIGHT, REQUEST_START_HEADER, RETRY_AFTER_SECONDS,
+    AdmissionController, Overloaded
+)
+from drift import DRIFT_FILE, DriftMonitor, DriftSketch
+from explain import IMPORTANCE_FILE, Explainer, load_global_importance
+from payload import PayloadError, TransactionParser, dumps, loads, parse_top_k
+from rules import TIER_STYLES, RuleEngine, rules_only_tier, tier_of
+from shadow import ShadowScorer
+from startup import StartupState
 
 app = Flask(__name__)
+logger = logging.getLogger(__name__)
 
 # --- Load Model ---
 def load_model():
@@ -25,110 +41,252 @@ def load_model():
         print(f"Model file not found at {model_path}")
         return None
 
-model = load_model()
+def load_shadow_model():
+    """Load the candidate model named by FRAUD_SHADOW_MODEL, if any"""
+    shadow_path = os.environ.get('FRAUD_SHADOW_MODEL')
+    if not shadow_path:
+        return None
+    try:
+        import joblib
+        # Candidate scoring yields to live traffic: it only runs while no request is admitted or queued
+        return ShadowScorer(joblib.load(shadow_path), name=os.path.basename(shadow_path),
+                            busy=lambda: admission.busy)
+    except FileNotFoundError:
+        print(f"Shadow model file not found at {shadow_path}")
+        return None
+
+def load_drift_monitor():
+    """Live drift sketch against the training reference, if one was saved"""
+    reference_path = os.path.join('models', DRIFT_FILE)
+    if not os.path.exists(reference_path):
+        return None
+    directory = os.environ.get('FRAUD_DRIFT_DIR', os.path.join(tempfile.gettempdir(), 'fraud_drift'))
+    return DriftMonitor(DriftSketch.load(reference_path), directory)
+
+def load_artifacts():
+    """Load every model artifact in the background, timing each phase"""
+    global model, shadow, drift_monitor, side_models, explainer, global_importance
+    try:
+        with startup.timed('model'):
+            model = load_model()
+        if model is None:
+            startup.finish(error='Model not loaded')
+            return
+        with startup.timed('explainer'):
+            explainer = Explainer(model)
+            global_importance = load_global_importance(os.path.join('models', IMPORTANCE_FILE))
+        # Candidate model scored off the request thread before promotion
+        with startup.timed('shadow_model'):
+            shadow = load_shadow_model()
+        with startup.timed('drift_reference'):
+            drift_monitor = load_drift_monitor()
+        # Optional PCA/KMeans cluster features; scoring works without them.
+        # Imported here since it pulls in scikit-learn and pandas
+        with startup.timed('side_models'):
+            from side_models import SIDE_MODELS_FILE, load_side_models
+            side_models = load_side_models(os.path.join('models', SIDE_MODELS_FILE))
+        startup.finish()
+        logger.info("Model artifacts loaded: %s", startup.snapshot())
+    except Exception as e:
+        logger.exception("Loading model artifacts failed")
+        startup.finish(error=str(e))
+
+# Artifacts load on a background thread so the server accepts connections (and
+# answers /readyz) straight away; scoring requests wait for them up to their deadline
+model = None
+shadow = None
+drift_monitor = None
+side_models = None
+explainer = None
+global_importance = None
+startup = StartupState()
+threading.Thread(target=load_artifacts, name='artifact-loader', daemon=True).start()
+rule_engine = RuleEngine()
+
+# --- Admission Control ---
+# Bounded in-flight scoring with per-request deadlines; shed requests either get a
+# fast 503 or, with FRAUD_SHED_FALLBACK=rules, a rules-only decision
+admission = AdmissionController(
+    max_inflight=int(os.environ.get('FRAUD_MAX_INFLIGHT', DEFAULT_MAX_INFLIGHT)),
+    default_deadline_ms=float(os.environ.get('FRAUD_DEADLINE_MS', DEFAULT_DEADLINE_MS))
+)
+shed_fallback = os.environ.get('FRAUD_SHED_FALLBACK', 'none')
+
+# Maximum transactions accepted by one /api/explain call
+MAX_EXPLAIN_BATCH = 10000
 
-# --- Transaction Type Mapping ---
-type_map = {'PAYMENT': 0, 'TRANSFER': 1, 'CASH_OUT': 2, 'DEBIT': 3, 'CASH_IN': 4}
+# Request fields are validated straight into a float32 model row
+transaction_parser = TransactionParser()
+
+def json_response(payload, status=200, headers=None):
+    """JSON response encoded with the fast encoder"""
+    return app.response_class(dumps(payload), status=status, headers=headers, mimetype='application/json')
+
+def query_flag(name):
+    """True when an optional response section is requested, e.g. ?clusters=1"""
+    return request.args.get(name, '').lower() in ('1', 'true', 'yes')
+
+def invalid_request(error):
+    return json_response({'error': 'Invalid request', 'fields': error.errors}, 400)
 
 @app.route('/')
 def index():
     """Main page with fraud detection form"""
     return render_template('index.html')
 
+def shed_response(error, fields):
+    """Response for a request that could not be scored before its deadline"""
+    headers = {'Retry-After': str(RETRY_AFTER_SECONDS)}
+    if shed_fallback == 'rules':
+        try:
+            assessment = rule_engine.assess_one(fields)
+            risk_level = rules_only_tier(len(assessment['risk_factors']))
+            admission.record_fallback()
+            return json_response({
+                'fraud_probability': None,
+                'risk_level': risk_level,
+                'risk_color': TIER_STYLES[risk_level]['color'],
+                'recommendation': TIER_STYLES[risk_level]['recommendation'],
+                'risk_factors': assessment['risk_factors'],
+                'validation': assessment['validation'],
+                'degraded': True,
+                'decision_source': 'rules',
+                'shed_reason': error.reason
+            }, 200, headers)
+        except Exception:
+            logger.exception("Rules fallback failed")
+    return json_response({'error': 'Service overloaded', 'reason': error.reason}, 503, headers)
+
 @app.route('/api/analyze', methods=['POST'])
 def analyze_transaction():
-    """Analyze transaction for fraud"""
+    """Analyze transaction for fraud, subject to admission control"""
+    deadline = admission.deadline_from(
+        request.headers.get(DEADLINE_HEADER),
+        request.headers.get(REQUEST_START_HEADER)
+    )
+    # Malformed requests are rejected before they take an admission slot
     try:
-        data = request.json
-        print("Received data:", data)  # Debugging log
+        X, fields = transaction_parser.parse(loads(request.get_data()))
+    except PayloadError as e:
+        return invalid_request(e)
+    try:
+        if not startup.wait(timeout=max(deadline - time.monotonic(), 0)):
+            if startup.status == 'loading':
+                raise admission.reject('model_loading')
+            return json_response({'error': 'Model not loaded'}, 500)
+        with admission.admit(deadline):
+            return score_transaction(X, fields, deadline)
+    except Overloaded as e:
+        return shed_response(e, fields)
 
-        # Extract transaction data
-        step = int(data.get('step', 1))
-        transaction_type = data.get('type', 'PAYMENT')
-        amount = float(data.get('amount', 0))
-        old_balance_orig = float(data.get('oldbalanceOrg', 0))
-        new_balance_orig = float(data.get('newbalanceOrg', 0))
-        old_balance_dest = float(data.get('oldbalanceDest', 0))
-        new_balance_dest = float(data.get('newbalanceDest', 0))
-        sender = data.get('sender', '')
-        recipient = data.get('recipient', '')
-        
-        # Prepare input for model
-        X = np.array([
-            step,
-            type_map[transaction_type],
-            amount,
-            old_balance_orig,
-            new_balance_orig,
-            old_balance_dest,
-            new_balance_dest
-        ]).reshape(1, -1)
-        print("Model input array:", X)  # Debugging log
-        
-        # Make prediction
-        if model is None:
-            return jsonify({'error': 'Model not loaded'}), 500
+def score_transaction(X, fields, deadline):
+    """Score one admitted, already parsed transaction"""
+    try:
+        logger.debug("Model input row: %s", X)
         
+        # Don't spend inference time on a caller that has already timed out
+        admission.check_deadline(deadline)
         prediction = model.predict_proba(X)
-        print("Model prediction:", prediction)  # Debugging log
+        logger.debug("Model prediction: %s", prediction)
         fraud_probability = float(prediction[0][1])
         
         # Determine risk level
-        if fraud_probability > 0.7:
-            risk_level = 'HIGH'
-            risk_color = '#e74c3c'
-            recommendation = 'BLOCK TRANSACTION'
-        elif fraud_probability > 0.3:
-            risk_level = 'MEDIUM'
-            risk_color = '#f39c12'
-            recommendation = 'ADDITIONAL VERIFICATION'
-        else:
-            risk_level = 'LOW'
-            risk_color = '#27ae60'
-            recommendation = 'APPROVE TRANSACTION'
+        risk_level = tier_of(fraud_probability)
+        risk_color = TIER_STYLES[risk_level]['color']
+        recommendation = TIER_STYLES[risk_level]['recommendation']
         
-        # Analyze risk factors
-        risk_factors = []
-        if amount > 10000:
-            risk_factors.append('High transaction amount')
-        if old_balance_orig == new_balance_orig + amount:
-            risk_factors.append('Perfect balance consistency')
-        if new_balance_dest == 0 and old_balance_dest == 0:
-            risk_factors.append('Recipient account shows no activity')
-        if transaction_type in ['CASH_OUT', 'TRANSFER']:
-            risk_factors.append(f'{transaction_type} transactions have higher risk')
-        
-        # Transaction validation
-        balance_check = old_balance_orig - new_balance_orig == amount
-        amount_reasonable = amount > 0 and amount < 100000
-        participant_check = sender != recipient
+        # Risk factors and transaction validation
+        assessment = rule_engine.assess_one(fields)
         
         response = {
             'fraud_probability': fraud_probability * 100,
             'risk_level': risk_level,
             'risk_color': risk_color,
             'recommendation': recommendation,
-            'risk_factors': risk_factors,
-            'validation': {
-                'balance_consistent': balance_check,
-                'amount_reasonable': amount_reasonable,
-                'different_participants': participant_check
-            },
+            'risk_factors': assessment['risk_factors'],
+            'validation': assessment['validation'],
             'transaction_details': {
-                'sender': sender,
-                'recipient': recipient,
-                'type': transaction_type,
-                'amount': amount,
-                'timestamp': datetime.now().isoformat()
+                'sender': fields['sender'],
+                'recipient': fields['recipient'],
+                'type': fields['type'],
+                'amount': fields['amount'],
+                'timestamp': datetime.now()
             }
         }
         
-        print("Response data:", response)  # Debugging log
-        return jsonify(response)
+        # Per-transaction attributions cost about twice the inference; batch callers use /api/explain
+        if query_flag('explain'):
+            response['explanation'] = explainer.explain(X[0])
+        
+        # Optional cluster features cost more than inference, so they are opt-in
+        if query_flag('clusters'):
+            response['clusters'] = side_models.assign_one(X[0]) if side_models is not None else None
+        
+        if shadow is not None:
+            shadow.submit(X, fraud_probability)
+        if drift_monitor is not None:
+            drift_monitor.update(X[0], fraud_probability)
+        return json_response(response)
         
+    except Overloaded:
+        raise
     except Exception as e:
-        print("Error during analysis:", str(e))  # Debugging log
-        return jsonify({'error': str(e)}), 500
+        logger.exception("Error during analysis")
+        return json_response({'error': str(e)}, 500)
+
+@app.route('/api/explain', methods=['POST'])
+def explain_transactions():
+    """Feature attributions for a batch of transactions in one booster call"""
+    try:
+        data = loads(request.get_data())
+        transactions = data.get('transactions', []) if isinstance(data, dict) else None
+        if not isinstance(transactions, list):
+            return json_response({'error': 'transactions must be a list'}, 400)
+        if not transactions:
+            return json_response({'error': 'No transactions provided'}, 400)
+        if len(transactions) > MAX_EXPLAIN_BATCH:
+            return json_response({'error': f'At most {MAX_EXPLAIN_BATCH} transactions per request'}, 413)
+        if startup.status == 'loading':
+            return json_response({'error': 'Model loading'}, 503, {'Retry-After': str(RETRY_AFTER_SECONDS)})
+        if explainer is None:
+            return json_response({'error': 'Model not loaded'}, 500)
+        
+        top_k = parse_top_k(data.get('top_k'))
+        X = transaction_parser.parse_batch(transactions)
+        return json_response({
+            'explanations': explainer.explain_batch(X, top_k=top_k),
+            'global_importance': global_importance
+        })
+        
+    except PayloadError as e:
+        return invalid_request(e)
+    except Exception as e:
+        logger.exception("Error during explanation")
+        return json_response({'error': str(e)}, 500)
+
+@app.route('/api/shadow')
+def shadow_stats():
+    """Score deltas and tier disagreements of the shadow model (per worker)"""
+    if shadow is None:
+        return json_response({'enabled': False})
+    return json_response({'enabled': True, **shadow.snapshot()})
+
+@app.route('/readyz')
+def readiness():
+    """200 once model artifacts are loaded, 503 while loading or after a failed load"""
+    return json_response(startup.snapshot(), 200 if startup.ready else 503)
+
+@app.route('/api/metrics')
+def service_metrics():
+    """Admission control counters (per worker): in-flight, admitted, shed, fallbacks"""
+    return json_response(admission.snapshot())
+
+@app.route('/api/drift')
+def drift_stats():
+    """PSI/KS drift of live traffic against the training distribution, merged across workers"""
+    if drift_monitor is None:
+        return json_response({'enabled': False})
+    return json_response({'enabled': True, **drift_monitor.report()})
 
 @app.route('/api/sample-data')
 def get_sample_data():
@@ -251,7 +409,7 @@ def get_sample_data():
             }
         ]
     }
-    return jsonify(samples)
+    return json_response(samples)
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)